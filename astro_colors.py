@@ -130,3 +130,19 @@ palette = {
         900: "#572108"
     }
 }
+
+# Colors of the sword plots and gallery pages
+theme = {
+    'target': palette["red"][500],
+    'tip': palette["hotorange"][500],
+    'rog': palette["green"][500],
+    'pommel': palette['brightblue'][500],
+    'rog_grip': palette["pink"][500],
+    'grip': palette['grey'][300],
+    'com': palette['yellow'][500],
+    'measurement': palette['yellow'][500],
+    'sword': palette['neutral'][0],
+    'background': palette["darkblue"][950],
+    'paper': palette["darkblue"][700],
+    'font': palette["neutral"][0],
+}
@@ -0,0 +1,98 @@
+"""Balance maps: how a sword's handling changes as the hand moves along the hilt.
+
+For every sword and every hand position on a shared grid (relative to grip_ref, as
+in the sword plots) this computes, as broadcast array operations:
+
+    cop       center of percussion for a hand there, i.e. the pivot conjugate to it
+    rog_grip  radius of gyration around the hand, as a position along the sword
+    inertia   moment of inertia around the hand, mass * (rog^2 + (com - hand)^2)
+
+Positions beyond a sword's own hilt (past the pommel or onto the blade) are NaN.
+Results are float32 and computed in row chunks, so 100k swords at 0.1 spacing fit
+in a few hundred MB.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from swords import center_of_percussion, rog_around_grip
+
+HAND_STEP = 0.1  # Grid spacing of hand positions
+CHUNK_VALUES = 4_000_000  # Max sword x position values computed at once
+MAX_MAP_ROWS = 2000  # Swords shown in a heatmap; larger maps are subsampled evenly
+QUANTITIES = {
+    'cop': "Center of Percussion",
+    'rog_grip': "ROG around Grip",
+    'inertia': "Moment of Inertia",
+}
+
+BalanceMap = namedtuple('BalanceMap', ['rows', 'hand', 'cop', 'rog_grip', 'inertia'])
+
+
+def hand_positions(pommel, step=HAND_STEP):
+    """Grid from the furthest pommel to grip_ref (0), aligned so that 0 is on it"""
+    lowest = np.nanmin(pommel) if len(pommel) else 0.0
+    n = int(np.floor(-min(lowest, 0.0) / step + 1e-9)) + 1
+    return np.arange(-(n - 1), 1) * step
+
+
+def balance_map(table, rows=None, step=HAND_STEP, hand=None):
+    """BalanceMap of the given table rows (all by default), each quantity (rows, positions).
+
+    hand overrides the grid of hand positions.
+    """
+    rows = np.arange(len(table)) if rows is None else np.asarray(rows)
+    com, rog, pommel = table.com[rows], table.rog[rows], table.pommel[rows]
+    hand = hand_positions(pommel, step) if hand is None else np.asarray(hand, dtype=float)
+    shape = (len(rows), len(hand))
+    cop, rog_grip, inertia = (np.empty(shape, dtype=np.float32) for _ in range(3))
+    mass = table.mass[rows]
+
+    per_chunk = max(1, CHUNK_VALUES // max(1, len(hand)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for s in range(0, len(rows), per_chunk):
+            c = com[s:s + per_chunk, None]
+            k = rog[s:s + per_chunk, None]
+            outside = (hand < pommel[s:s + per_chunk, None]) | (hand > 0)
+            cop[s:s + per_chunk] = np.where(outside, np.nan, center_of_percussion(c, k, hand))
+            rog_grip[s:s + per_chunk] = np.where(outside, np.nan, rog_around_grip(c, k, hand))
+            inertia[s:s + per_chunk] = np.where(outside, np.nan, mass[s:s + per_chunk, None] * (k**2 + (c - hand) ** 2))
+    return BalanceMap(rows, hand, cop, rog_grip, inertia)
+
+
+def balance_trace(bmap, quantity='cop', names=None, kind='heatmap', max_rows=MAX_MAP_ROWS):
+    """Heatmap or contour trace of one quantity: hand position across, sword down.
+
+    names labels the rows (one per row of bmap); past max_rows swords every n-th
+    row is shown.
+    """
+    import plotly.graph_objects as go
+
+    stride = max(1, -(-len(bmap.rows) // max_rows))
+    z = getattr(bmap, quantity)[::stride]
+    y = list(names[::stride]) if names is not None else bmap.rows[::stride]
+    Trace = go.Contour if kind == 'contour' else go.Heatmap
+    return Trace(
+        x=bmap.hand, y=y, z=z, name=QUANTITIES[quantity], colorscale='Viridis',
+        colorbar=dict(title=QUANTITIES[quantity]),
+        hovertemplate='%{y}<br>hand %{x:.1f}<br>%{z:.1f}<extra></extra>'
+    )
+
+
+def plot_balance_map(table, rows=None, quantity='cop', kind='heatmap', step=HAND_STEP):
+    """Figure with the balance map of one quantity for the given rows"""
+    import plotly.graph_objects as go
+    from dbp_plot import theme
+
+    bmap = balance_map(table, rows, step)
+    names = np.array([str(name).strip() for name in table.names[bmap.rows]], dtype=object)
+    fig = go.Figure(balance_trace(bmap, quantity, names, kind))
+    fig.update_xaxes(title_text="Hand position", gridcolor='rgb(60, 60, 60)')
+    fig.update_yaxes(autorange='reversed', gridcolor='rgb(60, 60, 60)')
+    fig.update_layout(
+        title_text=f"Balance Map - {QUANTITIES[quantity]}", title_x=0.5,
+        height=max(400, min(1200, 20 * len(bmap.rows) + 150)), width=900,
+        plot_bgcolor=theme['background'], paper_bgcolor=theme['paper'],
+        font=dict(color=theme['font']), margin=dict(l=20, r=20, t=40, b=40)
+    )
+    return fig
@@ -0,0 +1,186 @@
+"""Benchmarks for loading, dynamics, figure building and HTML export.
+
+    python bench.py --out bench.json
+    python bench.py --sizes 10 1000 --out new.json --baseline bench.json
+
+Catalogs are synthetic, generated from the data_swords.csv rows with a fixed seed so
+runs are comparable. Per-sword stages (circles, figure, html) run on a sample of at
+most --sample swords and are reported per sword as well as in total.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from swords import FIELDS, SwordTable, load_swords_from_csv, rog_from_pair, rog_from_pairs
+
+SIZES = [10, 1000, 100_000, 1_000_000]
+SAMPLE = 50
+REPEAT = 3
+SEED = 0
+REGRESSION = 1.10  # Flag stages more than 10% slower than the baseline
+
+
+def synthetic_catalog(n, path, source='data_swords.csv', seed=SEED):
+    """Write an n-row catalog CSV with the data_swords.csv schema, jittering the real rows"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    pair_cols = [col for col in df.columns if col.startswith('pair_')]
+    jitter = ['cog_ref', 'blade_ext'] + pair_cols
+    df[jitter] = df[jitter] + rng.normal(0, 0.3, (n, len(jitter)))
+    df['mass'] = df['mass'] * rng.normal(1, 0.02, n)
+    df['name'] = [f"Synthetic {i}" for i in range(n)]
+    df[['name'] + FIELDS + pair_cols].to_csv(path, index=False, float_format='%.3f')
+    return path
+
+
+def timed(func, repeat=REPEAT):
+    """Best wall time of func() over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rog_scalar(table):
+    """ROG per row the original way: rog_from_pair per pair, geometric mean per sword"""
+    rel = table.pairs - table.grip_ref[:, None]
+    out = []
+    for com, row in zip(table.com.tolist(), rel.tolist()):
+        rogs = [rog_from_pair(com, row[i], row[i + 1]) for i in range(0, len(row) - 1, 2)]
+        out.append(float(np.exp(np.mean(np.log(rogs)))))
+    return out
+
+
+def bench_size(n, workdir, sample=SAMPLE, repeat=REPEAT):
+    """Time every stage on an n-row synthetic catalog"""
+    import plotly.graph_objects as go
+    from circles import sword_circles
+    from dbp_plot import configure_plot_layout, plot_circle, plot_sword
+
+    path = synthetic_catalog(n, os.path.join(workdir, f'catalog_{n}.csv'))
+    results = []
+
+    def record(stage, seconds, count):
+        results.append({'stage': stage, 'rows': n, 'count': count,
+                        'seconds': seconds, 'per_item': seconds / count if count else None})
+
+    record('load_swords_from_csv', timed(lambda: load_swords_from_csv(path), repeat), n)
+    record('SwordTable.from_csv', timed(lambda: SwordTable.from_csv(path), repeat), n)
+
+    table = SwordTable.from_csv(path)
+    record('rog_from_pair (scalar)', timed(lambda: rog_scalar(table), repeat), n)
+    rel = table.pairs - table.grip_ref[:, None]
+    record('rog_from_pairs (vectorized)', timed(lambda: rog_from_pairs(table.com, rel), repeat), n)
+
+    swords = [table.sword(i) for i in range(min(n, sample))]
+
+    def circles():
+        fig = go.Figure()
+        for sword in swords:
+            sc = sword_circles(sword)
+            for i in range(len(sc.pivots)):
+                plot_circle(fig, sc.segments, i)
+
+    record('circles + plot_circle', timed(circles, repeat), len(swords))
+
+    def figures():
+        with redirect_stdout(io.StringIO()):
+            for sword in swords:
+                fig = go.Figure()
+                plot_sword(fig, sword)
+                configure_plot_layout(fig, sword)
+
+    record('plot_sword figure', timed(figures, repeat), len(swords))
+
+    figs = []
+    with redirect_stdout(io.StringIO()):
+        for sword in swords:
+            fig = go.Figure()
+            plot_sword(fig, sword)
+            configure_plot_layout(fig, sword)
+            figs.append(fig)
+    html_file = os.path.join(workdir, 'bench.html')
+    record('write_html', timed(lambda: [fig.write_html(html_file) for fig in figs], repeat), len(figs))
+    return results
+
+
+def environment():
+    """Versions and machine info stored with the results"""
+    import pandas
+    import plotly
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'plotly': plotly.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline):
+    """Print each stage's time against the baseline; returns the regressed stages"""
+    old = {(r['stage'], r['rows']): r['seconds'] for r in baseline['results']}
+    regressions = []
+    print(f"{'stage':<30} {'rows':>9} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for r in results:
+        before = old.get((r['stage'], r['rows']))
+        if before is None:
+            continue
+        ratio = r['seconds'] / before if before else float('inf')
+        flag = '  SLOWER' if ratio > REGRESSION else ''
+        print(f"{r['stage']:<30} {r['rows']:>9} {before:>10.4f} {r['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dynamic balance pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="catalog sizes in rows")
+    parser.add_argument('--sample', type=int, default=SAMPLE, help="swords used for per-sword stages")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="runs per stage, best is kept")
+    parser.add_argument('--out', help="write results as JSON")
+    parser.add_argument('--baseline', help="compare against a previous --out file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            for r in bench_size(n, workdir, args.sample, args.repeat):
+                results.append(r)
+                print(f"{r['stage']:<30} {r['rows']:>9} rows {r['seconds']:>10.4f} s")
+
+    report = {'environment': environment(), 'results': results}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Content-addressed on-disk cache of derived sword dynamics and circle geometry.
+
+Entries are keyed by a hash of one catalog row's input values plus the rendering
+parameters, so editing a row (or changing how circles are drawn) only invalidates
+that row. Entries live in a SQLite file and are evicted least-recently-used once
+the total size goes over a limit.
+"""
+import hashlib
+import io
+import json
+import math
+import sqlite3
+import time
+
+import numpy as np
+
+import circles
+import swords
+
+CACHE_FILE = '.dbp_cache.sqlite'
+MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = 2  # Bump when the cached computations change
+
+SCALARS = ['com', 'rog', 'cop', 'rog_grip', 'pommel', 'length']
+ROG_SCALARS = ['rog', 'cop', 'rog_grip']  # None for swords without a ROG
+
+
+def render_params():
+    """Parameters that change the cached geometry"""
+    return {
+        'version': CACHE_VERSION,
+        'view': list(circles.VIEW_BOX),
+        'tolerance': circles.TOLERANCE,
+        'grip': swords.GRIP,
+        'grip_step': circles.GRIP_STEP,
+        'target_distance': circles.TARGET_DISTANCE,
+    }
+
+
+def row_key(table, i, params=None):
+    """Content hash of row i's inputs and the rendering parameters"""
+    values = [float(getattr(table, field)[i]) for field in swords.FIELDS]
+    pairs = [None if math.isnan(p) else float(p) for p in table.pairs[i]]
+    # Trailing missing pairs are the same row whatever the number of pair columns
+    while pairs and pairs[-1] is None:
+        pairs.pop()
+    payload = json.dumps([str(table.names[i]), values, pairs, params or render_params()])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _finite(value):
+    """float(value), or None when it is missing or NaN"""
+    return float(value) if value is not None and math.isfinite(value) else None
+
+
+def compute_entry(sword):
+    """Derived scalars and circle arrays for one sword.
+
+    A sword without a ROG (no complete measurement pair) gets None for ROG_SCALARS
+    and no circles.
+    """
+    if sword.rog is None:
+        return {name: None if name in ROG_SCALARS else _finite(getattr(sword, name)) for name in SCALARS}, {}
+    scalars = {name: _finite(getattr(sword, name)) for name in SCALARS}
+    sc = circles.sword_circles(sword)
+    arrays = {'pivots': sc.pivots, 'n_grip': np.array(sc.n_grip)}
+    arrays.update(sc.segments._asdict())
+    return scalars, arrays
+
+
+def entry_circles(arrays):
+    """Rebuild SwordCircles from cached arrays (None for a sword without circles)"""
+    if not arrays:
+        return None
+    segments = circles.Segments(*(arrays[field] for field in circles.Segments._fields))
+    return circles.SwordCircles(arrays['pivots'], int(arrays['n_grip']), segments)
+
+
+class DynamicsCache:
+    """SQLite-backed cache of (scalars, arrays) entries with size-bounded LRU eviction"""
+
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, scalars TEXT, arrays BLOB, size INTEGER, used REAL);
+            CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+        """)
+        self.counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key):
+        """(scalars, arrays) for key, or None"""
+        row = self.db.execute("SELECT scalars, arrays FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.counts['misses'] += 1
+            return None
+        self.counts['hits'] += 1
+        self.db.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+        with np.load(io.BytesIO(row[1])) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        return json.loads(row[0]), arrays
+
+    def put(self, key, scalars, arrays):
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        blob = buf.getvalue()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(scalars), blob, len(blob), time.time()))
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        dropped = 0
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            dropped += 1
+        self.counts['evictions'] += dropped
+        return dropped
+
+    def lookup(self, table, rows):
+        """Cached (key, scalars, arrays) for each row, computing and storing the misses"""
+        params = render_params()
+        results = []
+        for i in rows:
+            key = row_key(table, i, params)
+            entry = self.get(key)
+            if entry is None:
+                entry = compute_entry(table.sword(i))
+                self.put(key, *entry)
+            results.append((key,) + entry)
+        self.evict()
+        return results
+
+    def stats(self):
+        """Entry count, size and lifetime hit/miss/eviction counters"""
+        entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        counters = dict(self.db.execute("SELECT name, value FROM counters").fetchall())
+        stats = {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes}
+        for name, value in self.counts.items():
+            stats[name] = counters.get(name, 0) + value
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+        return stats
+
+    def clear(self):
+        self.db.execute("DELETE FROM entries")
+        self.db.execute("DELETE FROM counters")
+        self.counts = dict.fromkeys(self.counts, 0)
+        self.db.commit()
+
+    def close(self):
+        """Persist this session's counters and commit"""
+        for name, value in self.counts.items():
+            self.db.execute(
+                "INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                (name, value, value))
+        self.counts = dict.fromkeys(self.counts, 0)
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,173 @@
+import numpy as np
+from collections import namedtuple
+
+# Visible region (x_min, x_max, y_min, y_max); x matches the axis range in plot_template
+VIEW_BOX = (-40, 120, -55, 55)
+
+# Largest distance between a drawn arc and the true circle, in plot units. The default
+# x range spans ~660 px, so this is about a quarter pixel.
+TOLERANCE = 0.05
+
+
+Segments = namedtuple('Segments', ['x', 'y', 'circle', 'start', 'stop'])
+Segments.__doc__ = """Visible circle pieces, flattened.
+
+x, y: coordinates of every visible point, all circles concatenated
+circle: index of the circle each segment belongs to
+start, stop: slice bounds of each segment into x and y
+"""
+
+
+def circle_params(com, rog, pivot):
+    """Center (on the x axis) and radius of the Hudgins circle through each pivot"""
+    com, rog, pivot = np.broadcast_arrays(
+        np.asarray(com, dtype=float), np.asarray(rog, dtype=float), np.asarray(pivot, dtype=float))
+    h = (pivot*pivot - com*com - rog*rog) / (2 * (pivot - com))
+    r = np.sqrt((com - h)**2 + rog**2)
+    return h, r
+
+
+def visible_arcs(h, r, view=VIEW_BOX):
+    """Angle ranges of each circle (center (h, 0), radius r) that lie inside the view box.
+
+    Returns (circle, a0, a1): circle index of each arc and its start/end angle, a0 < a1,
+    with a1 possibly past pi for arcs running through the left-most point of the circle.
+    """
+    h = np.atleast_1d(h)[:, None]
+    r = np.atleast_1d(r)[:, None]
+    x_min, x_max, y_min, y_max = view
+
+    # Every angle where a circle crosses a side of the box, plus the ends of [-pi, pi]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cx = np.arccos((np.array([x_min, x_max]) - h) / r)
+        sy = np.arcsin(np.array([y_min, y_max]) / r)
+    crossings = np.concatenate([cx, -cx, sy, np.pi - sy], axis=1)
+    crossings = np.where(crossings > np.pi, crossings - 2 * np.pi, crossings)
+    ends = np.broadcast_to([-np.pi, np.pi], (len(h), 2))
+    angles = np.sort(np.concatenate([ends, crossings], axis=1), axis=1)  # NaN sorts last
+
+    # Between consecutive crossings a circle is entirely in or out; test the midpoints
+    mid = (angles[:, :-1] + angles[:, 1:]) / 2
+    mx = h + r * np.cos(mid)
+    my = r * np.sin(mid)
+    inside = (x_min <= mx) & (mx <= x_max) & (y_min <= my) & (my <= y_max)
+
+    # Join runs of inside intervals into arcs
+    edges = np.diff(np.pad(inside, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    circle, first = np.nonzero(edges == 1)
+    _, last = np.nonzero(edges == -1)
+    a0 = angles[circle, first]
+    a1 = angles[circle, last]
+
+    # An arc ending at pi continues the circle's arc starting at -pi
+    is_first = np.r_[True, circle[1:] != circle[:-1]] if len(circle) else np.zeros(0, bool)
+    is_last = np.r_[circle[1:] != circle[:-1], True] if len(circle) else np.zeros(0, bool)
+    f, l = np.flatnonzero(is_first), np.flatnonzero(is_last)
+    wrap = (f != l) & (a0[f] == -np.pi) & (a1[l] == np.pi)
+    a1[l[wrap]] = a1[f[wrap]] + 2 * np.pi
+    keep = np.ones(len(circle), bool)
+    keep[f[wrap]] = False
+    return circle[keep], a0[keep], a1[keep]
+
+
+def sample_arcs(h, r, circle, a0, a1, tolerance=TOLERANCE):
+    """Sample each arc finely enough that its chords stay within tolerance of the circle"""
+    r_arc = np.atleast_1d(r)[circle]
+    step = 2 * np.arccos(np.clip(1 - tolerance / r_arc, -1, 1))
+    n_seg = np.maximum(1, np.ceil((a1 - a0) / step)).astype(int)
+    stop = np.cumsum(n_seg + 1)
+    start = stop - (n_seg + 1)
+
+    # Angles of every point of every arc in one flat array
+    arc = np.repeat(np.arange(len(circle)), n_seg + 1)
+    k = np.arange(stop[-1] if len(stop) else 0) - start[arc]
+    theta = a0[arc] + (a1 - a0)[arc] * k / n_seg[arc]
+    c = circle[arc]
+    x = np.atleast_1d(h)[c] + np.atleast_1d(r)[c] * np.cos(theta)
+    y = np.atleast_1d(r)[c] * np.sin(theta)
+    return Segments(x, y, circle, start, stop)
+
+
+def circle_segments(com, rog, pivots, view=VIEW_BOX, tolerance=TOLERANCE):
+    """Compute all clipped circle segments for the given pivots in one call"""
+    h, r = circle_params(com, rog, pivots)
+    return sample_arcs(h, r, *visible_arcs(h, r, view), tolerance=tolerance)
+
+
+def gapped(segments, circles=None):
+    """x and y of the chosen circles' segments (all by default) joined with NaN gaps"""
+    keep = np.ones(len(segments.circle), bool) if circles is None else np.isin(segments.circle, circles)
+    start, stop = segments.start[keep], segments.stop[keep]
+    lengths = stop - start
+    # Each segment is followed by one NaN separator
+    out_start = np.cumsum(lengths + 1) - (lengths + 1)
+    offset = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    src = np.repeat(start, lengths) + offset
+    dst = np.repeat(out_start, lengths) + offset
+    n = int((lengths + 1).sum())
+    x = np.full(n, np.nan)
+    y = np.full(n, np.nan)
+    x[dst] = segments.x[src]
+    y[dst] = segments.y[src]
+    return x, y
+
+
+def iter_segments(segments, circle):
+    """Yield (x, y) arrays for each visible segment of one circle"""
+    for i in np.flatnonzero(segments.circle == circle):
+        s, e = segments.start[i], segments.stop[i]
+        yield segments.x[s:e], segments.y[s:e]
+
+
+# Circles drawn for every sword, in drawing order: grip circles along the hilt, then
+# these named pivots, then one measurement circle per pair
+GRIP_STEP = 4.5  # Spacing of grip circles along the hilt
+TARGET_DISTANCE = 100  # "Pivot at Target" lies this far beyond the tip
+NAMED_PIVOTS = ['rog', 'tip', 'target', 'pommel', 'rog_grip']
+
+# Sword parts that are the same for every sword, drawn once into the base figure
+STATIC_GEOMETRY = [('Crossguard', [0.0, 0.0], [-10, 10], 5)]
+
+SwordCircles = namedtuple('SwordCircles', ['pivots', 'n_grip', 'segments'])
+
+
+def sword_geometry(sword, static=True):
+    """Blade, hilt and (with static) crossguard as (name, x, y, width) line parts"""
+    parts = [
+        ('Blade', [0, sword.length], [0, 0], 8),
+        ('Hilt', [sword.pommel, 0], [0, 0], 5),
+    ]
+    return parts + STATIC_GEOMETRY if static else parts
+
+
+def named_pivots(com, rog, length, pommel, rog_grip):
+    """Pivots of NAMED_PIVOTS, in that order (scalars, or arrays giving one row per pivot)"""
+    return [com + rog, length, length + TARGET_DISTANCE, pommel, rog_grip]
+
+
+def sword_pivots(sword):
+    """Pivot of every circle drawn for a sword, and how many of them are grip circles"""
+    grip_positions = []
+    hilt_position = 0
+    while hilt_position > sword.pommel + 2:
+        grip_positions.append(hilt_position)
+        hilt_position -= GRIP_STEP
+    named = named_pivots(sword.com, sword.rog, sword.length, sword.pommel, sword.rog_grip)
+    measurement = [point1 for point1, _ in sword.pairs]
+    return np.array(grip_positions + named + measurement, dtype=float), len(grip_positions)
+
+
+def sword_circles(sword):
+    """All clipped circles for one sword, computed in a single batch"""
+    pivots, n_grip = sword_pivots(sword)
+    return SwordCircles(pivots, n_grip, circle_segments(sword.com, sword.rog, pivots))
+
+
+def named_circle(circles, name):
+    """Circle index of one of NAMED_PIVOTS"""
+    return circles.n_grip + NAMED_PIVOTS.index(name)
+
+
+def measurement_circles(circles):
+    """Circle indices of the measurement circles"""
+    return range(circles.n_grip + len(NAMED_PIVOTS), len(circles.pivots))
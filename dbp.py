@@ -0,0 +1,477 @@
+"""Command line entry point for the dynamic balance tools.
+
+    python dbp.py stats [NAME ...] [--format text|json|csv] [--pendulum LOG]
+    python dbp.py plot NAME [--bands] [--pendulum LOG] [--compact] [--plotlyjs cdn] [--compress gz,br]
+    python dbp.py pendulum LOG [...] [--format text|json|csv]
+    python dbp.py uncertainty [NAME ...] [--draws N] [--format text|json|csv]
+    python dbp.py gallery [-o DIR] [-m GLOB] [-j N] [--compact] [--compress gz,br]
+    python dbp.py watch [-o DIR] [--compact] [--compress gz,br]
+    python dbp.py thumbs [-o DIR] [-m GLOB] [-j N]
+    python dbp.py report NAME
+    python dbp.py overlay [-m GLOB] [-o FILE]
+    python dbp.py balance [-m GLOB] [--quantity Q] [--contour] [-o FILE]
+    python dbp.py similar NAME [-k N | --radius R]
+    python dbp.py tune [NAME ...] --quantity Q (--target V | --change D) [--front] [-o FILE]
+    python dbp.py serve [-p PORT]
+    python dbp.py convert [-o DIR]
+    python dbp.py cache stats|clear
+
+Heavy modules (numpy, pandas, plotly) are imported inside the commands that need
+them, so `stats` never loads plotly or pandas.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+STATS_FIELDS = ['name', 'pommel', 'grip', 'com', 'length', 'rog', 'cop', 'rog_grip']
+
+
+def _load_catalog(args, engine='csv'):
+    from swords import Catalog
+
+    catalog = Catalog.load(args.csv, engine)
+    if getattr(args, 'pendulum', None):
+        from pendulum import fit_logs, with_pendulum
+        catalog = Catalog(with_pendulum(catalog.table, fit_logs(args.pendulum, catalog.table)))
+    return catalog
+
+
+def _resolve(catalog, names):
+    """Rows for the requested names (all rows if none), exits on unknown names"""
+    if not names:
+        return list(range(len(catalog)))
+    rows = []
+    for name in names:
+        row = catalog.find(name)
+        if row is None:
+            sys.exit(f"Sword '{name}' not found in the data file.")
+        rows.append(row)
+    return rows
+
+
+def _require_rog(catalog, rows, action):
+    """Exit cleanly if any of the rows has no ROG, which plotting and comparing need"""
+    for row in rows:
+        if not math.isfinite(catalog.table.rog[row]):
+            name = str(catalog.table.names[row]).strip()
+            sys.exit(f"Sword '{name}' has no ROG (no complete measurement pair), so it cannot be {action}.")
+
+
+def stats_records(table, rows):
+    """Derived quantities for the given table rows as dicts"""
+    columns = {
+        'pommel': table.pommel, 'com': table.com, 'length': table.length,
+        'rog': table.rog, 'cop': table.cop, 'rog_grip': table.rog_grip,
+    }
+    records = []
+    for row in rows:
+        record = {'name': table.names[row], 'grip': table.grip}
+        for field, values in columns.items():
+            value = float(values[row])
+            record[field] = None if value != value else value
+        records.append({field: record[field] for field in STATS_FIELDS})
+    return records
+
+
+def write_stats(records, fmt, out=sys.stdout):
+    """Print stats records as text, JSON or CSV"""
+    if fmt == 'json':
+        import json
+        json.dump(records, out, indent=2)
+        out.write('\n')
+    elif fmt == 'csv':
+        import csv
+        writer = csv.DictWriter(out, fieldnames=STATS_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        labels = {'pommel': 'Pommel', 'grip': 'Grip', 'com': 'COM', 'length': 'Length',
+                  'rog': 'ROG', 'cop': 'COP', 'rog_grip': 'ROG Grip'}
+        for record in records:
+            out.write(f"\n{record['name']}:\n")
+            for field, label in labels.items():
+                value = record[field]
+                out.write(f"{label}: {'n/a' if value is None else f'{value:.2f} mm'}\n")
+
+
+def cmd_stats(args):
+    catalog = _load_catalog(args)
+    write_stats(stats_records(catalog.table, _resolve(catalog, args.names)), args.format)
+
+
+def _plotlyjs(value):
+    """include_plotlyjs for plotly from --plotlyjs: embedded, from the CDN, or a script path"""
+    return {'inline': True, 'cdn': 'cdn'}.get(value, value)
+
+
+def cmd_plot(args):
+    from dbp_plot import build_figure, plot_single_sword
+
+    catalog = _load_catalog(args)
+    rows = _resolve(catalog, args.names)
+    _require_rog(catalog, rows, 'plotted')
+    if args.bands:
+        from uncertainty import add_error_bands, confidence_intervals, row_interval
+        intervals = confidence_intervals(catalog.table, rows, tolerances=_tolerances(args))
+    for i, row in enumerate(rows):
+        sword = catalog.table.sword(row)
+        fig = build_figure(sword)
+        if args.bands:
+            add_error_bands(fig, sword, row_interval(intervals, i))
+        plot_single_sword(sword, fig, args.compact, _plotlyjs(args.plotlyjs), args.compress)
+
+
+def cmd_pendulum(args):
+    from pendulum import fit_logs
+
+    catalog = _load_catalog(args)
+    fit = fit_logs(args.logs, catalog.table)
+    records = []
+    for i, name in enumerate(fit.names):
+        row = catalog.find(name)
+        record = {'name': name, 'cog_ref': fit.cog_ref[i], 'rog': fit.rog[i], 'rms': fit.rms[i],
+                  'pivots': int(fit.n_pivots[i]),
+                  'pair_rog': None if row is None else catalog.table.rog[row]}
+        records.append({k: None if isinstance(v, float) and v != v else v for k, v in record.items()})
+
+    if args.format == 'json':
+        import json
+        print(json.dumps(records, indent=2))
+    elif args.format == 'csv':
+        import csv
+        writer = csv.DictWriter(sys.stdout, fieldnames=['name', 'cog_ref', 'rog', 'rms', 'pivots', 'pair_rog'],
+                                lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        def fmt(value):
+            return 'n/a' if value is None else f'{value:.2f}'
+        for record in records:
+            print(f"\n{record['name']}:")
+            print(f"COG ref: {fmt(record['cog_ref'])} mm")
+            print(f"ROG: {fmt(record['rog'])} mm (from pairs: {fmt(record['pair_rog'])} mm)")
+            print(f"Fit RMS: {fmt(record['rms'])} mm over {record['pivots']} pivots")
+
+
+def _tolerances(args):
+    """Tolerances given on the command line; the rest default to uncertainty.TOLERANCES"""
+    given = {'grip_ref': args.grip_tol, 'cog_ref': args.cog_tol, 'pairs': args.pair_tol}
+    return {name: value for name, value in given.items() if value is not None}
+
+
+def cmd_uncertainty(args):
+    from uncertainty import QUANTITIES, confidence_intervals, row_interval
+
+    catalog = _load_catalog(args)
+    rows = _resolve(catalog, args.names)
+    intervals = confidence_intervals(catalog.table, rows, args.draws, _tolerances(args),
+                                     args.level, args.seed, args.workers)
+    records = []
+    for i, row in enumerate(rows):
+        record = {'name': catalog.table.names[row]}
+        for quantity, (mean, std, lo, hi) in row_interval(intervals, i).items():
+            record.update({f'{quantity}_mean': mean, f'{quantity}_std': std,
+                           f'{quantity}_lo': lo, f'{quantity}_hi': hi})
+        records.append(record)
+
+    if args.format == 'text':
+        for record in records:
+            print(f"\n{record['name']}:")
+            for q in QUANTITIES:
+                print(f"{q}: {record[q + '_mean']:.2f} +/- {record[q + '_std']:.2f} "
+                      f"({args.level:.0%}: {record[q + '_lo']:.2f} to {record[q + '_hi']:.2f})")
+    elif args.format == 'json':
+        import json
+        print(json.dumps(records, indent=2))
+    else:
+        import csv
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(records[0]) if records else ['name'], lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def _add_tolerance_args(p):
+    p.add_argument('--grip-tol', type=float, help="std dev of grip_ref readings")
+    p.add_argument('--cog-tol', type=float, help="std dev of cog_ref readings")
+    p.add_argument('--pair-tol', type=float, help="std dev of pair readings")
+
+
+def _add_output_args(p):
+    import precompress
+
+    p.add_argument('--compact', action='store_true', help="round coordinates and store them as base64 typed arrays")
+    p.add_argument('--compress', type=precompress.parse_encodings, default=[], metavar='gz,br',
+                   help="also write precompressed copies for a static server")
+
+
+def cmd_report(args):
+    from dbp_plot import trace_report
+
+    catalog = _load_catalog(args)
+    rows = _resolve(catalog, args.names)
+    _require_rog(catalog, rows, 'plotted')
+    for row in rows:
+        trace_report(catalog.table.sword(row))
+
+
+def cmd_gallery(args):
+    import profiling
+    from gallery import render_gallery
+
+    if args.profile:
+        profiling.enable(args.profile)
+    render_gallery(args.csv, args.out, args.match, args.workers, not args.no_cache, args.compact, args.compress)
+    profiling.print_summary()
+
+
+def cmd_watch(args):
+    from watch import watch
+
+    watch(args.csv, args.out, args.interval, args.workers, args.compact, args.compress)
+
+
+def cmd_thumbs(args):
+    from svg_thumbs import write_thumbnails
+
+    write_thumbnails(args.csv, args.out, args.match, args.workers)
+
+
+def cmd_overlay(args):
+    from gallery import select_rows
+    from overlay import plot_overlay
+    from swords import SwordTable
+
+    table = SwordTable.load(args.csv)
+    swords = [table.sword(i) for i in select_rows(table, args.match)]
+    fig = plot_overlay(swords)
+    fig.write_html(args.out, auto_open=False)
+    print(f"Overlaid {len(swords)} swords in {args.out}")
+
+
+def cmd_balance(args):
+    from balance_map import plot_balance_map
+    from gallery import select_rows
+    from swords import SwordTable
+
+    table = SwordTable.load(args.csv)
+    rows = select_rows(table, args.match)
+    fig = plot_balance_map(table, rows, args.quantity, 'contour' if args.contour else 'heatmap', args.step)
+    fig.write_html(args.out, auto_open=False)
+    print(f"Balance map of {len(rows)} swords in {args.out}")
+
+
+def cmd_similar(args):
+    from similarity import FeelIndex
+
+    catalog = _load_catalog(args, engine='pandas')
+    row = _resolve(catalog, [args.name])[0]
+    _require_rog(catalog, [row], 'compared')
+    index = FeelIndex(catalog.table)
+    if args.radius is not None:
+        rows, distances = index.within(row, args.radius)
+    else:
+        rows, distances = index.nearest(row, args.k)
+    for found, distance in zip(rows, distances):
+        print(f"{distance:8.4f}  {catalog.table.names[found]}")
+
+
+def cmd_tune(args):
+    import numpy as np
+    from tuning import HILT_FRACTIONS, QUANTITIES, best_options, current_value, plot_tuning, tune
+
+    catalog = _load_catalog(args)
+    table = catalog.table
+    rows = _resolve(catalog, args.names)
+    current = dict(zip(rows, current_value(table, rows, args.quantity)))
+    target = {row: value + args.change if args.target is None else args.target for row, value in current.items()}
+    steps = np.arange(0, args.max_mass + args.mass_step / 2, args.mass_step)
+    start = time.perf_counter()
+    front = tune(table, rows, args.quantity, [target[row] for row in rows], steps)
+    best = best_options(front, args.tolerance)
+    picks = range(len(front.rows)) if args.front else best
+    elapsed = time.perf_counter() - start
+    print(f"Tuned {len(rows)} swords over {2 * len(steps) * len(HILT_FRACTIONS)} options each in {elapsed:.2f} s",
+          file=sys.stderr)
+
+    records = []
+    for i in picks:
+        row = int(front.rows[i])
+        records.append({'name': str(table.names[row]).strip(), 'current': float(current[row]),
+                        'target': float(target[row]), 'mass': float(front.mass[i]),
+                        'position': float(front.position[i]), 'value': float(front.value[i]),
+                        'error': float(front.error[i]), 'com': float(front.com[i]), 'rog': float(front.rog[i])})
+    if args.format == 'json':
+        import json
+        print(json.dumps(records, indent=2))
+    elif args.format == 'csv':
+        import csv
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(records[0]) if records else ['name'], lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        label = QUANTITIES[args.quantity]
+        for r in records:
+            change = 'no change' if r['mass'] == 0 else f"{r['mass']:+.0f} at {r['position']:.1f}"
+            print(f"{r['name']}: {change:>14}  {label} {r['current']:.2f} -> {r['value']:.2f} "
+                  f"(target {r['target']:.2f}, off by {r['error']:.3f})")
+
+    if args.out and len(best):
+        first = best[0]
+        sword = table.sword(int(front.rows[first]))
+        plot_tuning(sword, front.mass[first], front.position[first], args.out)
+        print(f"Original and tuned {sword.name.strip()} in {args.out}", file=sys.stderr)
+
+
+def cmd_serve(args):
+    from server import serve
+
+    serve(args.csv, args.host, args.port, args.cache_size, args.verbose)
+
+
+def cmd_convert(args):
+    from swords import SwordTable
+
+    out = args.out or os.path.splitext(args.csv)[0] + '.npcat'
+    start = time.perf_counter()
+    table = SwordTable.from_csv(args.csv)
+    table.write_columnar(out, source=os.path.abspath(args.csv))
+    print(f"Wrote {len(table)} swords to {out}/ in {time.perf_counter() - start:.2f} s")
+
+
+def cmd_cache(args):
+    from cache import DynamicsCache
+
+    with DynamicsCache(args.cache_file) as cache:
+        if args.action == 'clear':
+            cache.clear()
+        for name, value in cache.stats().items():
+            print(f"{name}: {'n/a' if value is None else value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='dbp', description="Dynamic balance tools for swords")
+    parser.add_argument('--csv', default='data_swords.csv', help="sword catalog CSV or columnar directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('stats', help="print derived quantities without plotting")
+    p.add_argument('names', nargs='*', help="sword names (default: all)")
+    p.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text')
+    p.add_argument('--pendulum', action='append', metavar='LOG', help="take COM and ROG from swing logs (repeatable)")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('plot', help="plot swords and open them in a browser")
+    p.add_argument('names', nargs='+')
+    p.add_argument('--bands', action='store_true', help="draw Monte Carlo confidence intervals")
+    p.add_argument('--pendulum', action='append', metavar='LOG', help="take COM and ROG from swing logs (repeatable)")
+    p.add_argument('--plotlyjs', default='inline', metavar='inline|cdn|PATH',
+                   help="embed plotly.js, load it from the CDN, or reference a script at PATH")
+    _add_output_args(p)
+    _add_tolerance_args(p)
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser('pendulum', help="fit COM and ROG from pendulum swing logs")
+    p.add_argument('logs', nargs='+', help="swing log CSV files (sword,pivot,t,signal)")
+    p.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text')
+    p.set_defaults(func=cmd_pendulum)
+
+    p = sub.add_parser('uncertainty', help="Monte Carlo confidence intervals from measurement tolerances")
+    p.add_argument('names', nargs='*', help="sword names (default: all)")
+    p.add_argument('--draws', type=int, default=100_000, help="draws per sword")
+    p.add_argument('--level', type=float, default=0.95, help="confidence level")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-j', '--workers', type=int, default=1, help="processes to split swords across")
+    p.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text')
+    _add_tolerance_args(p)
+    p.set_defaults(func=cmd_uncertainty)
+
+    p = sub.add_parser('report', help="trace count and HTML size with and without trace merging")
+    p.add_argument('names', nargs='+')
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('gallery', help="render the catalog to a static HTML gallery")
+    p.add_argument('-o', '--out', default='gallery', help="output directory")
+    p.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    p.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    p.add_argument('--no-cache', action='store_true', help="recompute and re-render everything")
+    p.add_argument('--profile', metavar='JSONL', help="record stage timings to this file and print a summary")
+    _add_output_args(p)
+    p.set_defaults(func=cmd_gallery)
+
+    p = sub.add_parser('watch', help="re-render gallery pages as the catalog CSV is edited")
+    p.add_argument('-o', '--out', default='gallery', help="output directory")
+    p.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    p.add_argument('-i', '--interval', type=float, default=0.5, help="seconds between polls")
+    _add_output_args(p)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser('thumbs', help="write SVG thumbnails of the catalog, without plotly")
+    p.add_argument('-o', '--out', default='thumbs', help="output directory")
+    p.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    p.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_thumbs)
+
+    p = sub.add_parser('overlay', help="overlay the dynamics of many swords on one figure")
+    p.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    p.add_argument('-o', '--out', default='overlay.html', help="output HTML file")
+    p.set_defaults(func=cmd_overlay)
+
+    p = sub.add_parser('balance', help="map handling against hand position along the hilt")
+    p.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    p.add_argument('--quantity', choices=['cop', 'rog_grip', 'inertia'], default='cop')
+    p.add_argument('--contour', action='store_true', help="contour plot instead of a heatmap")
+    p.add_argument('--step', type=float, default=0.1, help="spacing of hand positions")
+    p.add_argument('-o', '--out', default='balance.html', help="output HTML file")
+    p.set_defaults(func=cmd_balance)
+
+    p = sub.add_parser('similar', help="swords that handle most like the given one")
+    p.add_argument('name')
+    p.add_argument('-k', type=int, default=5, help="number of neighbours")
+    p.add_argument('--radius', type=float, help="all swords within this feature distance instead")
+    p.set_defaults(func=cmd_similar)
+
+    p = sub.add_parser('tune', help="point mass on the hilt that moves a sword's dynamics to a target")
+    p.add_argument('names', nargs='*')
+    p.add_argument('--quantity', choices=['rog', 'com', 'cop', 'tip_pivot', 'pommel_pivot'], default='rog')
+    goal = p.add_mutually_exclusive_group(required=True)
+    goal.add_argument('--target', type=float, help="value to reach")
+    goal.add_argument('--change', type=float, help="change from the current value to reach")
+    p.add_argument('--tolerance', type=float, default=0.05, help="close enough to the target")
+    p.add_argument('--max-mass', type=float, default=150, help="largest mass added or removed")
+    p.add_argument('--mass-step', type=float, default=5, help="spacing of candidate masses")
+    p.add_argument('--front', action='store_true', help="list every Pareto option, not just the lightest good one")
+    p.add_argument('-o', '--out', help="HTML file comparing the first sword before and after")
+    p.add_argument('-f', '--format', choices=['text', 'json', 'csv'], default='text')
+    p.set_defaults(func=cmd_tune)
+
+    p = sub.add_parser('serve', help="serve sword plots over HTTP")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('-p', '--port', type=int, default=8050)
+    p.add_argument('--cache-size', type=int, default=256, help="figures kept in memory")
+    p.add_argument('-v', '--verbose', action='store_true', help="log every request")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('convert', help="write the catalog as memory-mappable .npy columns")
+    p.add_argument('-o', '--out', help="output directory (default: CSV name with .npcat)")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser('cache', help="inspect or clear the dynamics cache")
+    p.add_argument('action', choices=['stats', 'clear'])
+    p.add_argument('--cache-file', default='.dbp_cache.sqlite')
+    p.set_defaults(func=cmd_cache)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # Downstream of a pipe closed early (e.g. `| head`), nothing left to report
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,242 +1,173 @@
 import plotly.graph_objects as go
-import pandas as pd
+import plotly.io as pio
 import webbrowser
-import math
+import copy
+import functools
+import json
 import numpy as np
-from astro_colors import palette
-from scipy.stats import gmean
+import profiling
+import precompress
+from astro_colors import theme
+from circles import (STATIC_GEOMETRY, VIEW_BOX, iter_segments, measurement_circles, named_circle, sword_circles,
+                     sword_geometry)
+from swords import Catalog, Sword, SwordTable, load_swords_from_csv, rog_from_pair
 
 # Configuration
 SWORD_NAME = "Albion Crecy"
 DEMO = False
+MERGE_TRACES = True  # Join same-style segments/markers into a few traces per figure
+VALIDATE = False  # Plotly property validation of per-sword traces; turn on while changing styles
+COMPACT_DECIMALS = 2  # Coordinate precision of compact output; circles are only sampled to TOLERANCE anyway
+BINARY_MIN_POINTS = 16  # Shorter coordinate arrays stay JSON lists, which are smaller than their base64
 
-# Theme colors
-theme = {
-    'target': palette["red"][500],
-    'tip': palette["hotorange"][500],
-    'rog': palette["green"][500],
-    'pommel': palette['brightblue'][500],
-    'rog_grip': palette["pink"][500],
-    'grip': palette['grey'][300],
-    'com': palette['yellow'][500],
-    'measurement': palette['yellow'][500],
-    'sword': palette['neutral'][0],
-    'background': palette["darkblue"][950],
-    'paper': palette["darkblue"][700],
-    'font': palette["neutral"][0],
-}
-
-
-class Sword:
-    def __init__(self, mass, grip_ref, cog_ref, hilt_ext, blade_ext, lever_ref, name="Unnamed"):
-        print(f"Loading sword: {name} {grip_ref} {cog_ref}")
-        self.mass = float(mass)
-        self.grip_ref = float(grip_ref)
-        self.cog_ref = float(cog_ref)
-        self.hilt_ext = float(hilt_ext)
-        self.blade_ext = float(blade_ext)
-        self.lever_ref = float(lever_ref)
-        self.name = name
-        
-        # Calculate derived properties relative to grip position
-        self.grip = -4.5  # Middle of hand approximately
-        self.lever = self.lever_ref - self.grip_ref
-        self.length = self.blade_ext - self.grip_ref
-        self.com = self.cog_ref - self.grip_ref
-        self.pommel = self.hilt_ext - self.grip_ref
-        self.rog = None
-        self.pairs = []
-
-    def add_pair(self, point1, point2):
-        """Add measurement point pair for ROG calculation"""
-        point1 = point1 - self.grip_ref
-        point2 = point2 - self.grip_ref
-        self.pairs.append((point1, point2))
-
-
-def load_swords_from_csv(filename):
-    """Load sword data from CSV and return list of Sword objects"""
-    df = pd.read_csv(filename)
-    swords = []
-    
-    for _, row in df.iterrows():
-        sword = Sword(
-            mass=row['mass'],
-            grip_ref=row['grip_ref'],
-            cog_ref=row['cog_ref'],
-            hilt_ext=row['hilt_ext'],
-            blade_ext=row['blade_ext'],
-            lever_ref=row['lever_ref'],
-            name=row.get('name', f'Sword_{len(swords)+1}')
-        )
-        
-        # Process measurement pairs
-        pair_cols = [col for col in df.columns if col.startswith('pair_')]
-        pair_points = [row[col] for col in pair_cols if not pd.isna(row[col])]
-        
-        # Add pairs and calculate ROG
-        rogs = []
-        for i in range(0, len(pair_points)-1, 2):
-            if i+1 < len(pair_points):
-                sword.add_pair(pair_points[i], pair_points[i+1])
-                rogs.append(rog_from_pair(sword.com, pair_points[i]-sword.grip_ref, pair_points[i+1]-sword.grip_ref))
-        
-        sword.rog = gmean(rogs) if rogs else None
-        swords.append(sword)
-    
-    return swords
 
+def scatter(**props):
+    """go.Scatter, validated only when VALIDATE is set"""
+    return go.Scatter(_validate=VALIDATE, **props)
 
-def hudgins_circle(com, rog, p):
-    """Calculate circle parameters for given pivot point"""
-    h = (p*p - com*com - rog*rog) / (2 * (p - com))
-    r = math.sqrt((com - h)**2 + rog**2)
-    
-    def get_x(theta):
-        return h + r * math.cos(theta)
-    
-    def get_y(theta):
-        return r * math.sin(theta)
-    
-    return get_x, get_y
 
+@functools.lru_cache(maxsize=None)
+def plot_template():
+    """Plotly template with the theme's axes, legend, colors and margins, built once"""
+    template = go.layout.Template(pio.templates[pio.templates.default])
+    axis = dict(
+        dtick=20, gridcolor='rgb(60, 60, 60)', zerolinecolor='rgb(100, 100, 100)',
+        tickcolor='rgb(150, 150, 150)', linecolor='rgb(150, 150, 150)'
+    )
+    template.layout.update(
+        xaxis=dict(axis, range=list(VIEW_BOX[:2]), autorange=False),
+        yaxis=dict(axis, scaleanchor="x", scaleratio=1),
+        height=500, width=700,
+        title_x=0.5, title_y=0.98,
+        showlegend=True,
+        legend=dict(
+            orientation="h", yanchor="top", y=-0.08,
+            xanchor="center", x=0.5,
+            bgcolor=theme['paper'], bordercolor=theme['font'], borderwidth=1,
+            font=dict(color=theme['font'], size=10)
+        ),
+        plot_bgcolor=theme['background'],
+        paper_bgcolor=theme['paper'],
+        font=dict(color=theme['font']),
+        margin=dict(l=20, r=20, t=40, b=50)
+    )
+    return template
 
-def rog_from_pair(com, point1, point2):
-    """Calculate radius of gyration from measurement pair"""
-    d1 = com - point1
-    d2 = point2 - com
-    return math.sqrt(d1 * d2)
 
+@functools.lru_cache(maxsize=None)
+def _base_figure():
+    """Figure JSON with the template and the static sword parts, validated once"""
+    fig = go.Figure(layout=dict(template=plot_template()))
+    for part in STATIC_GEOMETRY:
+        add_sword_part(fig, *part)
+    return fig.to_plotly_json()
 
-def plot_circle(fig, get_x, get_y, name="unnamed", style=dict(color='black'), showlegend=False, legendrank=10):
-    """Plot circle with clipping for display range"""
-    theta_values = [math.radians(t) for t in range(-180, 181, 3)]
-    
-    x_vals = []
-    y_vals = []
-    for t in theta_values:
-        x = get_x(t)
-        y = get_y(t)
-        
-        # Clip to reasonable display range
-        if -55 <= y <= 55 and x < 120:
-            x_vals.append(x)
-            y_vals.append(y)
-        else:
-            if len(x_vals) > 0:
-                fig.add_trace(go.Scatter(
-                    x=x_vals, y=y_vals, mode='lines', name=name,
-                    showlegend=showlegend, legendrank=legendrank, line=style,
-                    hovertemplate='x=%{x:.1f}<br>y=%{y:.2f}'
-                ))
-                showlegend = False
-            x_vals = []
-            y_vals = []
-
-    if x_vals:
-        fig.add_trace(go.Scatter(
-            x=x_vals, y=y_vals, mode='lines', name=name,
+
+def new_figure():
+    """Empty sword figure cloned from the prebuilt base; add only the sword's own traces"""
+    return go.Figure(copy.deepcopy(_base_figure()), _validate=VALIDATE)
+
+
+def plot_circle(fig, segments, circle, name="unnamed", style=dict(color='black'), showlegend=False, legendrank=10):
+    """Plot the visible segments of one circle from a batch computed by circle_segments"""
+    for x_vals, y_vals in iter_segments(segments, circle):
+        fig.add_trace(scatter(
+            x=x_vals.tolist(), y=y_vals.tolist(), mode='lines', name=name,
             showlegend=showlegend, legendrank=legendrank, line=style,
             hovertemplate='x=%{x:.1f}<br>y=%{y:.2f}'
         ))
+        showlegend = False
 
 
-def add_sword_geometry(fig, sword):
-    """Add basic sword shape to plot"""
-    # Blade
-    fig.add_trace(go.Scatter(
-        x=[0, sword.length], y=[0, 0], mode='lines',
-        line=dict(color=theme['sword'], width=8),
-        name='Blade', showlegend=False
-    ))
-    
-    # Hilt
-    fig.add_trace(go.Scatter(
-        x=[sword.pommel, 0], y=[0, 0], mode='lines',
-        line=dict(color=theme['sword'], width=5),
-        name='Hilt', showlegend=False
+def add_sword_part(fig, name, x, y, width):
+    fig.add_trace(scatter(
+        x=x, y=y, mode='lines',
+        line=dict(color=theme['sword'], width=width),
+        name=name, showlegend=False
     ))
 
-    # Crossguard
-    fig.add_trace(go.Scatter(
-        x=[0.0, 0.0], y=[-10, 10], mode='lines',
-        line=dict(color=theme['sword'], width=5),
-        name='Crossguard', showlegend=False
-    ))
 
+def add_sword_geometry(fig, sword, static=True):
+    """Add basic sword shape to plot; static=False leaves out STATIC_GEOMETRY (already in new_figure())"""
+    for part in sword_geometry(sword, static):
+        add_sword_part(fig, *part)
 
-def add_dynamics_visualization(fig, sword):
+
+def add_dynamics_visualization(fig, sword, circles=None):
     """Add dynamic balance circles and points"""
+    # Every circle for this sword in one batch: grips, ROG, pivots, ROG around grip
+    if circles is None:
+        circles = sword_circles(sword)
+    segments = circles.segments
+
     # Grip circles along hilt
-    hilt_position = 0
-    while hilt_position > sword.pommel + 2:
-        get_x, get_y = hudgins_circle(sword.com, sword.rog, hilt_position)
-        plot_circle(fig, get_x, get_y, "Grip Circle", 
+    for i in range(circles.n_grip):
+        plot_circle(fig, segments, i, "Grip Circle", 
                    {'color': theme['background'], 'width': 2}, showlegend=False)
-        plot_circle(fig, get_x, get_y, "Grip Circle", 
+        plot_circle(fig, segments, i, "Grip Circle", 
                    {'color': theme['grip'], 'width': .5, 'dash':'dash'}, showlegend=False)
-        hilt_position -= 4.5
 
     # Center of percussion
-    cop = sword.com + sword.rog**2 / (sword.com - sword.grip)
-    fig.add_trace(go.Scatter(
+    cop = sword.cop
+    fig.add_trace(scatter(
         x=[cop], y=[0], mode='markers',
         marker=dict(color=theme['background'], size=10),
         showlegend=False
     ))
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=[cop], y=[0], mode='markers',
         marker=dict(color=theme['grip'], size=6),
         name='Center of Percussion', showlegend=True, legendrank=7
     ))
 
     # Main ROG circle
-    get_x, get_y = hudgins_circle(sword.com, sword.rog, sword.com + sword.rog)
-    plot_circle(fig, get_x, get_y, "ROG Circle", 
+    i = named_circle(circles, 'rog')
+    plot_circle(fig, segments, i, "ROG Circle", 
                {'color': theme['background'], 'width': 5}, showlegend=False)
-    plot_circle(fig, get_x, get_y, "Radius of Gyration", 
+    plot_circle(fig, segments, i, "Radius of Gyration", 
                {'color': theme['rog'], 'width': 2}, showlegend=True, legendrank=2)
 
     # Pivot circles for different positions
     pivot_configs = [
-        (sword.length, "Pivot at Tip", theme['tip'], 6),
-        (sword.length + 100, "Pivot at Target", theme['target'], 3),
-        (sword.pommel, "Action at Pommel", theme['pommel'], 5)
+        ('tip', "Pivot at Tip", theme['tip'], 6),
+        ('target', "Pivot at Target", theme['target'], 3),
+        ('pommel', "Action at Pommel", theme['pommel'], 5)
     ]
-    
-    for position, name, color, rank in pivot_configs:
-        get_x, get_y = hudgins_circle(sword.com, sword.rog, position)
-        plot_circle(fig, get_x, get_y, f"{name} Circle", 
+
+    for pivot, name, color, rank in pivot_configs:
+        i = named_circle(circles, pivot)
+        plot_circle(fig, segments, i, f"{name} Circle", 
                    {'color': theme['background'], 'width': 3}, showlegend=False)
-        plot_circle(fig, get_x, get_y, name, 
+        plot_circle(fig, segments, i, name, 
                    {'color': color, 'width': 1}, showlegend=True, legendrank=rank)
 
     # ROG around grip
-    r_hilt_squared = (sword.com - sword.grip) ** 2 + sword.rog**2
-    rog_grip = math.sqrt(r_hilt_squared) + sword.grip
-    get_x, get_y = hudgins_circle(sword.com, sword.rog, rog_grip)
-    plot_circle(fig, get_x, get_y, "ROG Grip Circle", 
+    i = named_circle(circles, 'rog_grip')
+    plot_circle(fig, segments, i, "ROG Grip Circle", 
                {'color': theme['background'], 'width': 3}, showlegend=False)
-    plot_circle(fig, get_x, get_y, "ROG around Grip", 
+    plot_circle(fig, segments, i, "ROG around Grip", 
                {'color': theme['rog_grip'], 'width': 1}, showlegend=True, legendrank=1)
 
     # ROG grip line
     for width, color in [(4, theme['background']), (2, theme['rog_grip'])]:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=[sword.grip, sword.com], y=[0, -sword.rog], mode='lines',
             line=dict(color=color, width=width, dash="solid"),
             showlegend=False
         ))
 
 
-def add_measurement_points(fig, sword):
+def add_measurement_points(fig, sword, circles=None):
     """Add measurement pairs and their circles"""
     legend_added = False
+    if circles is None:
+        circles = sword_circles(sword)
+    segments = circles.segments
     
-    for point1, point2 in sword.pairs:
+    for i, (point1, point2) in zip(measurement_circles(circles), sword.pairs):
         # Measurement points
         for size, color in [(6, theme['background']), (4, theme['measurement'])]:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(scatter(
                 x=[point1, point2], y=[0, 0], mode='markers',
                 marker=dict(color=color, size=size),
                 name='Measurements' if not legend_added and size == 4 else '',
@@ -246,8 +177,7 @@ def add_measurement_points(fig, sword):
         legend_added = True
         
         # Measurement circle
-        get_x, get_y = hudgins_circle(sword.com, sword.rog, point1)
-        plot_circle(fig, get_x, get_y, "Measurement Circle", 
+        plot_circle(fig, segments, i, "Measurement Circle", 
                    {'color': theme['measurement'], 'width': 1, "dash":"5px 20px"}, 
                    showlegend=False)
 
@@ -255,28 +185,28 @@ def add_measurement_points(fig, sword):
 def add_center_points(fig, sword):
     """Add center of mass and dynamic balance points"""
     # ROG line
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=[sword.com, sword.com], y=[0, sword.rog], mode='lines',
         line=dict(color=theme['rog'], width=2, dash="solid"),
         showlegend=False
     ))
 
     # Background circles for center points
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=[sword.com] * 3, y=[sword.rog, 0, -sword.rog], mode='markers',
         marker=dict(color=theme['background'], size=12),
         showlegend=False
     ))
     
     # Center of Mass
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=[sword.com], y=[0], mode='markers',
         marker=dict(color=theme['com'], size=8),
         name='Center of Mass', showlegend=True, legendrank=8
     ))
     
     # Dynamic Balance Points
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=[sword.com] * 2, y=[sword.rog, -sword.rog], mode='markers',
         marker=dict(color=theme['rog'], size=6),
         showlegend=False
@@ -290,14 +220,101 @@ def add_center_points(fig, sword):
     )
 
 
-def plot_sword(fig, sword, demo=False):
-    """Plot complete sword with all dynamics visualization"""
-    add_sword_geometry(fig, sword)
+def _merge_key(trace):
+    """Group key for a trace that can be merged, or None to leave it alone"""
+    style = lambda d: json.dumps(d, sort_keys=True)
+    mode = trace.get('mode')
+    if trace.get('type') != 'scatter' or mode not in ('lines', 'markers'):
+        return None
+    if mode == 'lines':
+        line = trace.get('line', {})
+        if line.get('color') == theme['background'] and not trace.get('showlegend'):
+            # Halo: drawn under the colored line of the same shape, name is never shown
+            return ('halo', style(line))
+        return ('lines', trace.get('name'), style(line), trace.get('legendrank'), trace.get('hovertemplate'))
+    return ('markers', style(trace.get('marker', {})), trace.get('legendrank'), trace.get('hovertemplate'))
+
+
+def merge_traces(fig):
+    """Join traces with the same style into one trace each, separating pieces with gaps.
+
+    Each merged trace keeps the position of its first member, so the layering of
+    halos under their lines is preserved. Legend entries keep their name and rank.
+    """
+    groups = {}
+    merged = []
+    for trace in fig.data:
+        trace = trace.to_plotly_json()
+        key = _merge_key(trace)
+        group = groups.get(key) if key else None
+        name = trace.get('name')
+        if group is not None and key[0] == 'markers' and name and group.get('name') and name != group['name']:
+            # Never fold two different legend entries together
+            group = None
+        if group is None:
+            trace['x'], trace['y'] = list(trace['x']), list(trace['y'])
+            if key and key[0] == 'halo':
+                # The colored line on top has the same points and shows the hover
+                trace.pop('hovertemplate', None)
+                trace['hoverinfo'] = 'skip'
+            merged.append(trace)
+            if key:
+                groups[key] = trace
+            continue
+        if key[0] != 'markers':
+            group['x'].append(None)
+            group['y'].append(None)
+        group['x'].extend(trace['x'])
+        group['y'].extend(trace['y'])
+        if trace.get('showlegend') and not group.get('showlegend'):
+            group['name'] = name
+            group['showlegend'] = True
+        elif name and not group.get('name'):
+            group['name'] = name
+
+    fig.data = []
+    fig.add_traces(merged)
+    return fig
+
+
+def trace_report(sword):
+    """Print trace count and figure HTML size with and without trace merging"""
+    sizes = []
+    for merge in (False, True):
+        fig = new_figure()
+        plot_sword(fig, sword, demo=DEMO, verbose=False, static=False)
+        if merge:
+            merge_traces(fig)
+        configure_plot_layout(fig, sword)
+        html = fig.to_html(include_plotlyjs=False, full_html=True)
+        sizes.append((len(fig.data), len(html.encode())))
+    (n0, b0), (n1, b1) = sizes
+    print(f"Traces: {n0} -> {n1}")
+    print(f"HTML (excluding plotly.js): {b0 / 1024:.1f} KB -> {b1 / 1024:.1f} KB")
+
+
+def plot_sword(fig, sword, demo=False, verbose=True, circles=None, static=True):
+    """Plot complete sword with all dynamics visualization.
+
+    circles: precomputed sword_circles(sword), e.g. from the dynamics cache
+    static: also draw STATIC_GEOMETRY; pass False for figures from new_figure()
+    """
+    with profiling.stage('add_sword_geometry', sword.name, fig):
+        add_sword_geometry(fig, sword, static)
     
     if not demo:
-        add_dynamics_visualization(fig, sword)
-        add_measurement_points(fig, sword)
-        add_center_points(fig, sword)
+        if circles is None:
+            with profiling.stage('sword_circles', sword.name):
+                circles = sword_circles(sword)
+        with profiling.stage('add_dynamics_visualization', sword.name, fig):
+            add_dynamics_visualization(fig, sword, circles)
+        with profiling.stage('add_measurement_points', sword.name, fig):
+            add_measurement_points(fig, sword, circles)
+        with profiling.stage('add_center_points', sword.name, fig):
+            add_center_points(fig, sword)
+
+    if not verbose:
+        return
 
     # Print sword statistics
     print(f"\n{sword.name}:")
@@ -308,61 +325,79 @@ def plot_sword(fig, sword, demo=False):
     print(f"ROG: {sword.rog:.2f} mm")
 
 
-def configure_plot_layout(fig, sword):
-    """Configure plot axes and layout"""
-    fig.update_xaxes(
-        range=[-40, 120], autorange=False, dtick=20,
-        gridcolor='rgb(60, 60, 60)', zerolinecolor='rgb(100, 100, 100)',
-        tickcolor='rgb(150, 150, 150)', linecolor='rgb(150, 150, 150)'
-    )
-    fig.update_yaxes(
-        scaleanchor="x", scaleratio=1, dtick=20,
-        gridcolor='rgb(60, 60, 60)', zerolinecolor='rgb(100, 100, 100)',
-        tickcolor='rgb(150, 150, 150)', linecolor='rgb(150, 150, 150)'
-    )
-    
-    fig.update_layout(
-        height=500, width=700,
-        title_text=f"Dynamic Balance Point - {sword.name}",
-        title_x=0.5, title_y=0.98,
-        showlegend=True,
-        legend=dict(
-            orientation="h", yanchor="top", y=-0.08,
-            xanchor="center", x=0.5,
-            bgcolor=theme['paper'], bordercolor=theme['font'], borderwidth=1,
-            font=dict(color=theme['font'], size=10)
-        ),
-        plot_bgcolor=theme['background'],
-        paper_bgcolor=theme['paper'],
-        font=dict(color=theme['font']),
-        margin=dict(l=20, r=20, t=40, b=50)
-    )
-
-
-def plot_single_sword(sword):
-    """Create and display plot for a single sword"""
-    fig = go.Figure()
-    plot_sword(fig, sword, demo=DEMO)
-    configure_plot_layout(fig, sword)
+def configure_plot_layout(fig, sword, title=None):
+    """Configure plot axes and layout: the shared template plus the title"""
+    fig.update_layout(template=plot_template(), title_text=title or f"Dynamic Balance Point - {sword.name}")
+
+
+def build_figure(sword, verbose=True, circles=None):
+    """Build the complete, laid out figure for a single sword"""
+    fig = new_figure()
+    plot_sword(fig, sword, demo=DEMO, verbose=verbose, circles=circles, static=False)
+    if MERGE_TRACES:
+        with profiling.stage('merge_traces', sword.name, fig):
+            merge_traces(fig)
+    with profiling.stage('configure_plot_layout', sword.name):
+        configure_plot_layout(fig, sword)
+    return fig
+
+
+def compact_figure(fig, decimals=COMPACT_DECIMALS):
+    """Shrink the figure's JSON in place.
+
+    Coordinates are rounded to display precision and longer arrays become float32,
+    which plotly writes as base64 typed arrays: fewer bytes than decimal text and
+    no number parsing in the browser. Gaps (None) become NaN, which plotly also
+    draws as gaps. The template's per-trace-type defaults are dropped; none apply
+    to the traces these figures use.
+    """
+    for trace in fig.data:
+        for axis in ('x', 'y'):
+            values = trace[axis]
+            if values is None or isinstance(values, str):
+                continue
+            values = np.round(np.array(values, dtype=float), decimals)
+            trace[axis] = values.astype(np.float32) if len(values) >= BINARY_MIN_POINTS else values.tolist()
+    fig.layout.template.data = {}
+    return fig
+
+
+def write_figure(fig, path, include_plotlyjs=True, compress=()):
+    """Write the figure as an HTML page, plus precompressed copies; returns the bytes written.
+
+    include_plotlyjs is passed to plotly: True embeds plotly.js, 'cdn' or a path
+    references it. compress lists encodings from precompress.ENCODINGS.
+    """
+    page = fig.to_html(include_plotlyjs=include_plotlyjs, full_html=True).encode()
+    return precompress.write_file(path, page, compress)
+
+
+def plot_single_sword(sword, fig=None, compact=False, include_plotlyjs=True, compress=()):
+    """Create (unless given) and display plot for a single sword"""
+    if fig is None:
+        fig = build_figure(sword)
+    if compact:
+        compact_figure(fig)
     
     html_file = f"{sword.name.lower().replace(' ', '_')}_sword_plot.html"
-    fig.write_html(html_file, auto_open=False)
+    with profiling.stage('write_html', sword.name) as stage:
+        stage.bytes = write_figure(fig, html_file, include_plotlyjs, compress)
     webbrowser.open(html_file)
 
 
 def main():
     """Main execution function"""
-    swords = load_swords_from_csv('data_swords.csv')
+    catalog = Catalog.from_csv('data_swords.csv')
     
-    target_sword = next((sword for sword in swords if sword.name == SWORD_NAME), None)
+    target_sword = catalog.lookup(SWORD_NAME)
     
     if target_sword:
         plot_single_sword(target_sword)
     else:
         print(f"Sword '{SWORD_NAME}' not found in the data file.")
         print("Available swords:")
-        for sword in swords:
-            print(f"  - {sword.name}")
+        for name in catalog.table.names:
+            print(f"  - {name}")
 
 
 if __name__ == "__main__":
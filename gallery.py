@@ -0,0 +1,296 @@
+import argparse
+import fnmatch
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import precompress
+import profiling
+from svg_thumbs import THUMB_WIDTH, render_thumbnails
+from swords import SwordTable
+
+PLOTLYJS = 'plotly.min.js'  # Shared asset written once next to the per-sword pages
+MANIFEST = 'manifest.json'  # Content key of every rendered page, to skip unchanged rows
+THUMBS = 'thumbs'  # Subdirectory of the SVG thumbnails shown in the index
+
+
+def slugify(name):
+    """File-system and URL safe name for a sword"""
+    return re.sub(r'[^a-z0-9]+', '_', name.strip().lower()).strip('_') or 'sword'
+
+
+def select_rows(table, patterns=None):
+    """Row indices whose name matches any of the (case-insensitive) glob patterns"""
+    if not patterns:
+        return list(range(len(table)))
+    patterns = [p.lower() for p in patterns]
+    return [i for i, name in enumerate(table.names)
+            if any(fnmatch.fnmatch(name.strip().lower(), p) for p in patterns)]
+
+
+def plottable_rows(table, rows):
+    """Split rows into those that can be plotted and those without a usable ROG, length or pommel"""
+    ok = np.isfinite(table.rog) & np.isfinite(table.length) & np.isfinite(table.pommel)
+    return [i for i in rows if ok[i]], [i for i in rows if not ok[i]]
+
+
+def report_skipped(table, rows, limit=5):
+    """Print which rows were left out for lacking a ROG"""
+    if rows:
+        names = ', '.join(str(table.names[i]).strip() for i in rows[:limit])
+        more = f" and {len(rows) - limit} more" if len(rows) > limit else ''
+        print(f"Skipped {len(rows)} swords without a usable ROG: {names}{more}")
+
+
+def assign_filenames(names):
+    """Unique HTML file name per sword, in order"""
+    used = set()
+    filenames = []
+    for name in names:
+        slug = base = slugify(name)
+        n = 2
+        while slug in used:
+            slug = f"{base}_{n}"
+            n += 1
+        used.add(slug)
+        filenames.append(f"{slug}.html")
+    return filenames
+
+
+def thumb_filename(filename):
+    """Index-relative path of the SVG thumbnail of a sword page"""
+    return f"{THUMBS}/{os.path.splitext(filename)[0]}.svg"
+
+
+def remove_page(out_dir, filename):
+    """Delete a sword's page, its precompressed copies and its thumbnail"""
+    for name in [filename, thumb_filename(filename)] + [f"{filename}.{e}" for e in precompress.ENCODINGS]:
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+def render_sword(sword, path, circles=None, compact=False, compress=()):
+    """Worker: build one sword's figure and write it, referencing the shared plotly.js.
+
+    compact rounds and binary-encodes the coordinates (see compact_figure); compress
+    lists precompressed copies to write next to the page.
+    """
+    from dbp_plot import build_figure, compact_figure, write_figure
+
+    fig = build_figure(sword, verbose=False, circles=circles)
+    if compact:
+        compact_figure(fig)
+    with profiling.stage('write_html', sword.name) as stage:
+        size = stage.bytes = write_figure(fig, path, PLOTLYJS, compress)
+    return size
+
+
+_tables = {}  # Columnar catalogs opened by this worker process
+
+
+def _job_sword(sword):
+    """A job's sword: a Sword, or (columnar catalog, row) read from the shared memory map"""
+    if isinstance(sword, tuple):
+        path, row = sword
+        if path not in _tables:
+            _tables[path] = SwordTable.from_columnar(path)
+        return _tables[path].sword(row)
+    return sword
+
+
+def _render_job(job):
+    """Pool worker: render one job, returning its size and, if asked, its stage records"""
+    sword, *job, profile = job
+    job = [_job_sword(sword)] + job
+    if not profile:
+        profiling.disable()
+        return render_sword(*job), []
+    profiler = profiling.enable()
+    try:
+        return render_sword(*job), profiler.records
+    finally:
+        profiling.disable()
+
+
+def render_jobs(jobs, workers=None):
+    """Render (sword, path, circles, compact, compress, profile) jobs, in parallel when there are several.
+
+    sword may be (columnar catalog, row), so workers read it from the memory map
+    instead of receiving a pickled copy.
+
+    Returns the number of bytes written.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [(render_sword(_job_sword(job[0]), *job[1:-1]), []) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // (4 * workers))
+            results = list(pool.map(_render_job, jobs, chunksize=chunksize))
+    total = 0
+    for size, records in results:
+        total += size
+        profiling.add_records(records)
+    return total
+
+
+def page_key(row_key, compact=False, compress=()):
+    """Content key of a rendered page: the row's cache key plus the figure styling and output options"""
+    import dbp_plot
+
+    style = [row_key, dbp_plot.theme, dbp_plot.DEMO, dbp_plot.MERGE_TRACES, compact, list(compress)]
+    return hashlib.sha1(json.dumps(style, sort_keys=True).encode()).hexdigest()
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(out_dir, manifest):
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def write_plotlyjs(out_dir, compress=()):
+    """Write the plotly.js bundle shared by every page"""
+    from plotly.offline import get_plotlyjs
+
+    return precompress.write_file(os.path.join(out_dir, PLOTLYJS), get_plotlyjs().encode(), compress)
+
+
+def write_index(out_dir, entries, compress=()):
+    """Write index.html linking every rendered sword, with its thumbnail; entries are (sword, filename)"""
+    from astro_colors import theme
+
+    rows = []
+    for sword, filename in entries:
+        rog = f"{sword.rog:.2f}" if sword.rog is not None else ''
+        link = html.escape(filename)
+        rows.append(
+            f'<tr><td><a href="{link}"><img src="{html.escape(thumb_filename(filename))}" width="{THUMB_WIDTH}" '
+            f'loading="lazy" alt=""></a></td>'
+            f'<td><a href="{link}">{html.escape(sword.name.strip())}</a></td>'
+            f'<td>{sword.length:.2f}</td><td>{sword.com:.2f}</td><td>{rog}</td></tr>'
+        )
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Dynamic Balance Gallery</title>
+<style>
+body {{ background: {theme['paper']}; color: {theme['font']}; font-family: Arial, sans-serif; }}
+table {{ border-collapse: collapse; }}
+td, th {{ padding: 2px 12px; text-align: right; }}
+td:nth-child(-n+2), th:nth-child(-n+2) {{ text-align: left; }}
+img {{ display: block; }}
+a {{ color: {theme['pommel']}; }}
+</style></head>
+<body><h1>Dynamic Balance Gallery</h1>
+<table><tr><th></th><th>Sword</th><th>Length</th><th>COM</th><th>ROG</th></tr>
+{chr(10).join(rows)}
+</table></body></html>
+"""
+    return precompress.write_file(os.path.join(out_dir, 'index.html'), page.encode(), compress)
+
+
+def render_gallery(csv_file='data_swords.csv', out_dir='gallery', patterns=None, workers=None, use_cache=True,
+                   compact=False, compress=()):
+    """Render every (matching) sword to out_dir in parallel, plus plotly.js and an index page
+    with an SVG thumbnail of every sword.
+
+    csv_file may also be a columnar catalog directory (see SwordTable.write_columnar).
+
+    With use_cache, derived dynamics come from the on-disk cache and pages whose row
+    and styling are unchanged since the last run are not rendered again. Swords
+    without a ROG are reported and get no page. Pages in the manifest that no longer
+    belong to a sword are deleted.
+
+    File names are assigned over the whole catalog, so a run limited by patterns
+    names pages like a full run, and the index lists every page in the manifest.
+
+    compact writes rounded, binary-encoded coordinates; compress lists precompressed
+    copies (precompress.ENCODINGS) to write next to every page, plotly.js and the index.
+    """
+    from cache import DynamicsCache, entry_circles
+
+    start = time.perf_counter()
+    compress = precompress.available(compress)
+    table = SwordTable.load(csv_file)
+    columnar = os.path.isdir(csv_file)
+    filenames = assign_filenames([str(name) for name in table.names])
+    plottable, _ = plottable_rows(table, range(len(table)))
+    rows, skipped = plottable_rows(table, select_rows(table, patterns))
+    report_skipped(table, skipped)
+
+    os.makedirs(os.path.join(out_dir, THUMBS), exist_ok=True)
+    manifest = read_manifest(out_dir)
+    removed = sorted(set(manifest) - {filenames[i] for i in plottable})
+    for filename in removed:
+        remove_page(out_dir, filename)
+        del manifest[filename]
+    if use_cache:
+        with DynamicsCache() as cache:
+            entries = cache.lookup(table, rows)
+        keys = [page_key(key, compact, compress) for key, _, _ in entries]
+        sword_circles = [entry_circles(arrays) for _, _, arrays in entries]
+    else:
+        keys = [None] * len(rows)
+        sword_circles = [None] * len(rows)
+
+    total = 0
+    plotlyjs = [PLOTLYJS] + [f"{PLOTLYJS}.{encoding}" for encoding in compress]
+    if not use_cache or not all(os.path.exists(os.path.join(out_dir, name)) for name in plotlyjs):
+        total += write_plotlyjs(out_dir, compress)
+    jobs = []
+    thumbs = []
+    for row, key, sc in zip(rows, keys, sword_circles):
+        filename = filenames[row]
+        path = os.path.join(out_dir, filename)
+        thumb = os.path.join(out_dir, thumb_filename(filename))
+        if key is not None and manifest.get(filename) == key and os.path.exists(path) and os.path.exists(thumb):
+            continue
+        jobs.append(((csv_file, row) if columnar else table.sword(row), path, sc, compact, compress, profiling.enabled()))
+        thumbs.append((row, thumb))
+        manifest[filename] = key
+    total += render_jobs(jobs, workers)
+    total += render_thumbnails(table, [row for row, _ in thumbs], [thumb for _, thumb in thumbs], workers)
+    indexed = [(table.sword(i), filenames[i]) for i in plottable if filenames[i] in manifest]
+    total += write_index(out_dir, indexed, compress)
+    write_manifest(out_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    unchanged = len(rows) - len(jobs)
+    print(f"Rendered {len(jobs)} swords ({unchanged} unchanged, {len(removed)} removed) to {out_dir}/ "
+          f"in {elapsed:.2f} s, {total / 1024:.0f} KB written")
+    return [filenames[i] for i in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the sword catalog to a static HTML gallery")
+    parser.add_argument('csv', nargs='?', default='data_swords.csv', help="catalog CSV or columnar directory")
+    parser.add_argument('-o', '--out', default='gallery', help="output directory")
+    parser.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true', help="recompute and re-render everything")
+    parser.add_argument('--compact', action='store_true', help="round and binary-encode coordinates")
+    parser.add_argument('--compress', type=precompress.parse_encodings, default=[], metavar='gz,br',
+                        help="also write precompressed copies for a static server")
+    parser.add_argument('--profile', metavar='JSONL', help="record stage timings to this file and print a summary")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
+    render_gallery(args.csv, args.out, args.match, args.workers, not args.no_cache, args.compact, args.compress)
+    profiling.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Overlay the dynamics of many swords on one figure.
+
+Every property (ROG circle, each pivot circle, COM, DBPs, center of percussion, blade
+outline) becomes one trace for all swords, with NaN gaps between swords. Past
+GL_THRESHOLD swords the traces switch to WebGL, and circle sampling is coarsened so
+the figure stays under MAX_POINTS line points.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+from circles import NAMED_PIVOTS, TOLERANCE, circle_segments, gapped, named_pivots
+from dbp_plot import configure_plot_layout, sword_geometry, theme
+
+GL_THRESHOLD = 50  # Use Scattergl above this many swords
+MAX_POINTS = 200_000  # Line point budget for all overlaid circles
+
+# Overlaid circles: (pivot, legend name, color, legend rank)
+OVERLAY_CIRCLES = [
+    ('rog', "Radius of Gyration", theme['rog'], 2),
+    ('target', "Pivot at Target", theme['target'], 3),
+    ('pommel', "Action at Pommel", theme['pommel'], 5),
+    ('tip', "Pivot at Tip", theme['tip'], 6),
+]
+
+
+def overlay_pivots(swords):
+    """com, rog and pivot of every overlaid circle, (n_swords, n_circles) each"""
+    com = np.array([sword.com for sword in swords])
+    rog = np.array([sword.rog for sword in swords])
+    length = np.array([sword.length for sword in swords])
+    pommel = np.array([sword.pommel for sword in swords])
+    rog_grip = np.array([sword.rog_grip for sword in swords])
+    positions = dict(zip(NAMED_PIVOTS, named_pivots(com, rog, length, pommel, rog_grip)))
+    pivots = np.column_stack([positions[pivot] for pivot, *_ in OVERLAY_CIRCLES])
+    n = len(OVERLAY_CIRCLES)
+    return np.repeat(com[:, None], n, axis=1), np.repeat(rog[:, None], n, axis=1), pivots
+
+
+def overlay_segments(swords, max_points=MAX_POINTS):
+    """Clipped circles for every sword, decimated to fit max_points.
+
+    Points per arc scale with 1/sqrt(tolerance), so one resample with a larger
+    tolerance brings the total close to the budget.
+    """
+    com, rog, pivots = overlay_pivots(swords)
+    segments = circle_segments(com.ravel(), rog.ravel(), pivots.ravel())
+    if len(segments.x) > max_points:
+        tolerance = TOLERANCE * (len(segments.x) / max_points) ** 2
+        segments = circle_segments(com.ravel(), rog.ravel(), pivots.ravel(), tolerance=tolerance)
+    return segments
+
+
+def plot_overlay(swords, max_points=MAX_POINTS, gl=None, title=None):
+    """Figure with the dynamics of all swords overlaid"""
+    swords = [sword for sword in swords if sword.rog is not None]
+    if gl is None:
+        gl = len(swords) > GL_THRESHOLD
+    Trace = go.Scattergl if gl else go.Scatter
+    # Fade each sword's lines as more are stacked on top of each other
+    opacity = float(np.clip(3 / np.sqrt(max(len(swords), 1)), 0.15, 1))
+    fig = go.Figure()
+
+    # Sword outlines, one trace per part; identical parts (the crossguard) drawn once
+    parts = {}
+    for sword in swords:
+        for name, x, y, width in sword_geometry(sword):
+            parts.setdefault((name, width), set()).add((tuple(x), tuple(y)))
+    for (name, width), shapes in parts.items():
+        x = [v for xs, _ in shapes for v in xs + (None,)]
+        y = [v for _, ys in shapes for v in ys + (None,)]
+        fig.add_trace(Trace(
+            x=x, y=y, mode='lines', name=name, showlegend=False, hoverinfo='skip',
+            line=dict(color=theme['sword'], width=min(width, 3)), opacity=opacity
+        ))
+
+    # Circles: one trace per kind across all swords
+    segments = overlay_segments(swords, max_points)
+    n = len(OVERLAY_CIRCLES)
+    for k, (pivot, name, color, rank) in enumerate(OVERLAY_CIRCLES):
+        x, y = gapped(segments, np.arange(k, n * len(swords), n))
+        fig.add_trace(Trace(
+            x=x, y=y, mode='lines', name=name, legendrank=rank, hoverinfo='skip',
+            line=dict(color=color, width=1), opacity=opacity
+        ))
+
+    # Points, labelled with the sword name on hover
+    names = [sword.name for sword in swords]
+    com = np.array([sword.com for sword in swords])
+    rog = np.array([sword.rog for sword in swords])
+    cop = np.array([sword.cop for sword in swords])
+    zeros = np.zeros(len(swords))
+    points = [
+        (cop, zeros, names, 'Center of Percussion', theme['grip'], 6, 7),
+        (np.r_[com, com], np.r_[rog, -rog], names + names, 'Dynamic Balance Points', theme['rog'], 6, 9),
+        (com, zeros, names, 'Center of Mass', theme['com'], 6, 8),
+    ]
+    for x, y, text, name, color, size, rank in points:
+        fig.add_trace(Trace(
+            x=x, y=y, text=text, mode='markers', name=name, legendrank=rank,
+            marker=dict(color=color, size=size),
+            hovertemplate='%{text}<br>x=%{x:.1f}<br>y=%{y:.2f}<extra></extra>'
+        ))
+
+    configure_plot_layout(fig, None, title=title or f"Dynamic Balance Overlay - {len(swords)} swords")
+    return fig
@@ -0,0 +1,196 @@
+"""Center of mass and radius of gyration from pendulum swing logs.
+
+A rig hangs the sword from a pivot and logs an accelerometer while it swings. Logs
+are CSV files with one sample per row:
+
+    sword,pivot,t,signal
+    Albion Crecy,1.5,0.000,0.0123
+
+pivot is a tape reading in the same units and frame as the catalog, t is in seconds.
+Rows of one swing are contiguous; a swing is a run of rows with the same sword and
+pivot. The period of each swing is the slope of a line through its upward zero
+crossings (of the signal minus its mean, with a small noise band), found for all
+swings in a chunk at once.
+
+For a pivot at p, a period T gives the equivalent length L = g T^2 / (4 pi^2) =
+(k^2 + d^2) / d with d = |c - p|, which is linear in A = c and B = c^2 + k^2:
+
+    A (s L + 2 p) - B = p^2 + s L p,    s = sign(c - p)
+
+so every sword with two or more pivots is solved by linear least squares, all
+swords in one batch. s depends on the unknown c, so the solve is repeated with
+updated signs until they stop changing.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from swords import SwordTable, normalize_name
+
+G = 981.0  # cm/s^2, catalog lengths are in cm
+LOG_COLUMNS = ['sword', 'pivot', 't', 'signal']
+CHUNK_ROWS = 1_000_000  # Log rows read at a time
+MIN_CROSSINGS = 3  # Swings with fewer upward zero crossings are dropped
+HYSTERESIS = 0.1  # Noise band around zero, as a fraction of the swing's signal std
+MAX_SIGN_ITERATIONS = 10
+
+Swings = namedtuple('Swings', ['swords', 'pivots', 'periods', 'crossings'])
+PendulumFit = namedtuple('PendulumFit', ['names', 'cog_ref', 'rog', 'rms', 'n_pivots'])
+
+
+def swing_periods(run, t, signal):
+    """Period and number of upward zero crossings of every swing.
+
+    run is the swing index of every sample, non-decreasing from 0. Returns
+    (periods, crossings), one per swing; periods are NaN for swings with fewer
+    than MIN_CROSSINGS crossings.
+    """
+    t, signal = np.asarray(t, dtype=float), np.asarray(signal, dtype=float)
+    n_runs = int(run[-1]) + 1 if len(run) else 0
+    counts = np.maximum(np.bincount(run, minlength=n_runs), 1)
+    mean = np.bincount(run, weights=signal, minlength=n_runs) / counts
+    v = signal - mean[run]
+    std = np.sqrt(np.bincount(run, weights=v * v, minlength=n_runs) / counts)
+
+    # Hysteresis: only samples clear of the noise band around zero take part, and an
+    # upward crossing is a below-band sample followed by an above-band one. The
+    # crossing time is interpolated between those two samples.
+    state = np.sign(v) * (np.abs(v) > HYSTERESIS * std[run])
+    idx = np.flatnonzero(state)
+    up = np.flatnonzero((state[idx[:-1]] < 0) & (state[idx[1:]] > 0) & (run[idx[:-1]] == run[idx[1:]]))
+    i0, i1 = idx[up], idx[up + 1]
+    tc = t[i0] + (t[i1] - t[i0]) * -v[i0] / (v[i1] - v[i0])
+    owner = run[i0]
+
+    # Least squares slope of crossing time against crossing number, per swing
+    n = np.bincount(owner, minlength=n_runs).astype(float)
+    first = np.cumsum(n) - n
+    j = np.arange(len(up)) - first[owner]
+    sj = np.bincount(owner, weights=j, minlength=n_runs)
+    st = np.bincount(owner, weights=tc, minlength=n_runs)
+    sjj = np.bincount(owner, weights=j * j, minlength=n_runs)
+    sjt = np.bincount(owner, weights=j * tc, minlength=n_runs)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        periods = (n * sjt - sj * st) / (n * sjj - sj ** 2)
+    periods[n < MIN_CROSSINGS] = np.nan
+    return periods, n.astype(int)
+
+
+def _chunk_swings(df):
+    """Swings of a DataFrame of complete swings"""
+    swords = df['sword'].to_numpy(dtype=object)
+    pivots = df['pivot'].to_numpy(dtype=float)
+    starts = np.r_[0, np.flatnonzero((swords[1:] != swords[:-1]) | (pivots[1:] != pivots[:-1])) + 1]
+    run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(df)]))
+    periods, crossings = swing_periods(run, df['t'].to_numpy(), df['signal'].to_numpy())
+    return Swings(swords[starts], pivots[starts], periods, crossings)
+
+
+def iter_swings(filename, chunksize=CHUNK_ROWS):
+    """Stream the swings of a log file, one Swings batch per chunk.
+
+    The last swing of a chunk may continue in the next one, so it is held back and
+    processed with the following chunk.
+    """
+    import pandas as pd
+
+    carry = None
+    for df in pd.read_csv(filename, usecols=LOG_COLUMNS, chunksize=chunksize,
+                          dtype={'sword': str, 'pivot': float, 't': float, 'signal': float}):
+        if carry is not None:
+            df = pd.concat([carry, df], ignore_index=True)
+        swords, pivots = df['sword'].to_numpy(dtype=object), df['pivot'].to_numpy(dtype=float)
+        last = len(df) - 1
+        while last > 0 and swords[last - 1] == swords[-1] and pivots[last - 1] == pivots[-1]:
+            last -= 1
+        carry = df.iloc[last:]
+        if last:
+            yield _chunk_swings(df.iloc[:last])
+    if carry is not None and len(carry):
+        yield _chunk_swings(carry)
+
+
+def read_swings(filenames, chunksize=CHUNK_ROWS):
+    """All swings with a period in the given log files"""
+    parts = [s for filename in filenames for s in iter_swings(filename, chunksize)]
+    if not parts:
+        return Swings(*(np.array([], dtype=dtype) for dtype in (object, float, float, int)))
+    swings = Swings(*(np.concatenate(arrays) for arrays in zip(*parts)))
+    keep = np.isfinite(swings.periods)
+    return Swings(*(a[keep] for a in swings))
+
+
+def solve_pendulum(sword, pivots, periods, n_swords, com_guess=None, g=G):
+    """Least squares center of mass and ROG of many swords at once.
+
+    sword is the sword index (0..n_swords-1) of every period. com_guess gives the
+    initial side of each pivot; by default the COM is assumed to be past every
+    pivot. Returns (com, rog, rms, n_pivots) per sword, in the frame of pivots;
+    rms is the root mean square error of the equivalent lengths. Swords with fewer
+    than two distinct pivots, or no consistent solution, get NaN.
+    """
+    sword = np.asarray(sword)
+    p = np.asarray(pivots, dtype=float)
+    L = g * np.asarray(periods, dtype=float) ** 2 / (4 * np.pi ** 2)
+    n = np.bincount(sword, minlength=n_swords).astype(float)
+    com = np.full(n_swords, np.inf) if com_guess is None else np.asarray(com_guess, dtype=float).copy()
+
+    def sums(weights):
+        return np.bincount(sword, weights=weights, minlength=n_swords)
+
+    side = None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(MAX_SIGN_ITERATIONS):
+            new_side = np.where(np.isnan(com[sword]), 1.0, np.sign(com[sword] - p))
+            if side is not None and np.array_equal(new_side, side):
+                break
+            side = new_side
+            a = side * L + 2 * p
+            y = p ** 2 + side * L * p
+            sa, say, saa, sy = sums(a), sums(a * y), sums(a * a), sums(y)
+            det = n * saa - sa ** 2
+            com = (n * say - sa * sy) / det
+            b = (sa * say - saa * sy) / det
+        rog = np.sqrt(b - com ** 2)
+        d = np.abs(com[sword] - p)
+        rms = np.sqrt(sums((L - (rog[sword] ** 2 + d ** 2) / d) ** 2) / n)
+
+    # Distinct pivots per sword: a single pivot swung many times still leaves the fit underdetermined
+    pairs = np.unique(np.column_stack([sword, p]), axis=0)
+    n_pivots = np.bincount(pairs[:, 0].astype(int), minlength=n_swords)
+    bad = (n_pivots < 2) | ~np.isfinite(rog)
+    com[bad] = rog[bad] = rms[bad] = np.nan
+    return com, rog, rms, n_pivots
+
+
+def fit_logs(filenames, table=None, chunksize=CHUNK_ROWS, g=G):
+    """PendulumFit of every sword in the logs.
+
+    With a table, swords are matched to it by name and its cog_ref readings decide
+    which side of the COM each pivot is on.
+    """
+    swings = read_swings(filenames, chunksize)
+    keys = np.array([normalize_name(name) for name in swings.swords], dtype=object)
+    names, first, sword = np.unique(keys, return_index=True, return_inverse=True)
+    com_guess = None
+    if table is not None:
+        rows = {normalize_name(str(name)): row for row, name in reversed(list(enumerate(table.names)))}
+        com_guess = np.array([table.cog_ref[rows[key]] if key in rows else np.nan for key in names])
+    cog_ref, rog, rms, n_pivots = solve_pendulum(sword.ravel(), swings.pivots, swings.periods,
+                                                 len(names), com_guess, g)
+    return PendulumFit(swings.swords[first], cog_ref, rog, rms, n_pivots)
+
+
+def with_pendulum(table, fit):
+    """Copy of table with cog_ref and ROG taken from the pendulum fit where it has them.
+
+    The ROG of swords without a fit still comes from their measurement pairs.
+    """
+    solved = {normalize_name(str(name)): i for i, name in enumerate(fit.names) if np.isfinite(fit.rog[i])}
+    match = np.array([solved.get(normalize_name(str(name)), -1) for name in table.names], dtype=int)
+    has = match >= 0
+    cog_ref = np.where(has, fit.cog_ref[match], table.cog_ref)
+    columns = [table.names, table.mass, table.grip_ref, cog_ref, table.hilt_ext, table.blade_ext, table.lever_ref,
+               table.pairs]
+    rog = np.where(has, fit.rog[match], SwordTable(*columns).rog)
+    return SwordTable(*columns, rog=rog)
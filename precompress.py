@@ -0,0 +1,67 @@
+"""Write static files together with precompressed copies.
+
+Next to every file, a compressed copy per encoding is written (page.html.gz,
+page.html.br), so a static server configured for precompressed files (nginx
+gzip_static / brotli_static, Caddy's file_server precompressed) hands them out
+directly instead of compressing each response. Brotli needs the optional brotli
+package; available() drops 'br' when it is not installed.
+"""
+import gzip
+import os
+
+ENCODINGS = ['gz', 'br']
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def available(encodings):
+    """The given encodings whose encoder is installed; missing ones are reported and dropped"""
+    encodings = list(encodings)
+    for encoding in encodings:
+        if encoding not in ENCODINGS:
+            raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+    if 'br' in encodings:
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            print("brotli is not installed, skipping .br files (pip install brotli)")
+            encodings.remove('br')
+    return encodings
+
+
+def compress(data, encoding):
+    """data compressed with one of ENCODINGS"""
+    if encoding == 'gz':
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)  # mtime=0: same input, same bytes
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def write_file(path, data, encodings=()):
+    """Write bytes to path plus a compressed copy per encoding; returns the bytes written.
+
+    Copies in other encodings left from earlier runs are removed, so a server never
+    hands out a stale one.
+    """
+    with open(path, 'wb') as f:
+        f.write(data)
+    total = len(data)
+    for encoding in ENCODINGS:
+        if encoding not in encodings:
+            try:
+                os.remove(f"{path}.{encoding}")
+            except FileNotFoundError:
+                pass
+            continue
+        packed = compress(data, encoding)
+        with open(f"{path}.{encoding}", 'wb') as f:
+            f.write(packed)
+        total += len(packed)
+    return total
+
+
+def parse_encodings(value):
+    """'gz,br' style command line value as the available encodings ('' for none)"""
+    return available(e.strip() for e in value.split(',') if e.strip())
@@ -0,0 +1,156 @@
+"""Optional stage-level timing for the plotting pipeline.
+
+    profiling.enable('profile.jsonl')
+    with profiling.stage('add_center_points', sword.name, fig) as s:
+        ...
+        s.bytes = 1234  # optional, for stages that write output
+    profiling.print_summary()
+
+Each stage records wall time and, when given the figure, how many traces and points
+it added. Records are appended to a JSON lines sink as they happen. When profiling is
+disabled stage() returns a shared no-op context, so the cost is one function call.
+"""
+import json
+import time
+
+
+class _NullStage:
+    bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _figure_size(fig):
+    """Trace count and total number of x values in a figure"""
+    return len(fig.data), sum(len(trace.x) for trace in fig.data if getattr(trace, 'x', None) is not None)
+
+
+class _Stage:
+    def __init__(self, profiler, name, sword, fig):
+        self.profiler = profiler
+        self.name = name
+        self.sword = sword
+        self.fig = fig
+        self.bytes = None
+
+    def __enter__(self):
+        if self.fig is not None:
+            self.traces, self.points = _figure_size(self.fig)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        record = {'stage': self.name, 'sword': self.sword, 'seconds': seconds,
+                  'traces': None, 'points': None, 'bytes': self.bytes}
+        if self.fig is not None:
+            traces, points = _figure_size(self.fig)
+            record['traces'] = traces - self.traces
+            record['points'] = points - self.points
+        self.profiler.add(record)
+        return False
+
+
+class Profiler:
+    """Collects stage records and appends them to an optional JSON lines file"""
+
+    def __init__(self, sink=None):
+        self.records = []
+        # Line buffered, so forked workers never inherit unwritten records
+        self.sink = open(sink, 'a', buffering=1) if sink else None
+
+    def stage(self, name, sword=None, fig=None):
+        return _Stage(self, name, sword, fig)
+
+    def add(self, record):
+        self.records.append(record)
+        if self.sink:
+            self.sink.write(json.dumps(record) + '\n')
+
+    def summary(self):
+        """Totals per stage: calls, seconds (total, mean, max, share), traces, points, bytes"""
+        stages = {}
+        for r in self.records:
+            s = stages.setdefault(r['stage'], {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                               'traces': 0, 'points': 0, 'bytes': 0})
+            s['calls'] += 1
+            s['seconds'] += r['seconds']
+            s['max_seconds'] = max(s['max_seconds'], r['seconds'])
+            for field in ('traces', 'points', 'bytes'):
+                s[field] += r[field] or 0
+        total = sum(s['seconds'] for s in stages.values()) or 1.0
+        for s in stages.values():
+            s['mean_seconds'] = s['seconds'] / s['calls']
+            s['share'] = s['seconds'] / total
+        return stages
+
+    def close(self):
+        if self.sink:
+            self.sink.close()
+            self.sink = None
+
+
+_active = None
+
+
+def enable(sink=None):
+    """Start recording stages, appending each record to the JSON lines file sink if given"""
+    global _active
+    disable()
+    _active = Profiler(sink)
+    return _active
+
+
+def disable():
+    """Stop recording; returns the profiler that was active, if any"""
+    global _active
+    profiler, _active = _active, None
+    if profiler:
+        profiler.close()
+    return profiler
+
+
+def enabled():
+    return _active is not None
+
+
+def active():
+    """The active Profiler, or None"""
+    return _active
+
+
+def stage(name, sword=None, fig=None):
+    """Context manager timing one stage for one sword (no-op unless enabled)"""
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, sword, fig)
+
+
+def add_records(records):
+    """Add records collected elsewhere, e.g. in worker processes"""
+    if _active is not None:
+        for record in records:
+            _active.add(record)
+
+
+def print_summary(profiler=None):
+    """Print per-stage totals, slowest stage first"""
+    profiler = profiler or _active
+    if profiler is None or not profiler.records:
+        return
+    print(f"{'stage':<28} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'share':>6} "
+          f"{'traces':>7} {'points':>9} {'bytes':>11}")
+    rows = sorted(profiler.summary().items(), key=lambda item: -item[1]['seconds'])
+    for name, s in rows:
+        print(f"{name:<28} {s['calls']:>6} {s['seconds']:>9.3f} {s['mean_seconds'] * 1000:>9.2f} "
+              f"{s['max_seconds'] * 1000:>9.2f} {s['share']:>6.1%} {s['traces']:>7} {s['points']:>9} {s['bytes']:>11}")
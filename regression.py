@@ -0,0 +1,255 @@
+"""Streaming least squares polynomial fits, overall and per category.
+
+A fit keeps only the sufficient statistics of its observations (power sums of x up to
+2 * degree, sums of y * x^k and of y^2), so files of any size are read in chunks,
+fits can be updated as new rows arrive, and partial fits from separate files or
+processes are merged by adding their sums. x is shifted and scaled by a fixed
+center and scale before taking powers to keep the sums well conditioned.
+
+    fit = fit_files(['data_tools.csv'], degree=2)
+    fit.overall.poly()                    # np.poly1d in x, like np.polyfit
+    fit.categories['Framing Hammer'].r2()
+    fit.save('tools_fit.json')            # later: GroupedFit.load(...).update(...)
+"""
+import argparse
+import json
+
+import numpy as np
+
+CHUNK_ROWS = 1_000_000  # Rows read at a time
+X_COLUMN = 'Length (Overall, cm)'
+Y_COLUMN = 'Mass (Total, g)'
+CATEGORY_COLUMN = 'Category'
+
+
+class PolyFit:
+    """Running least squares fit of a polynomial of the given degree"""
+
+    def __init__(self, degree=2, center=0.0, scale=1.0):
+        self.degree = degree
+        self.center = float(center)
+        self.scale = float(scale)
+        self.moments = np.zeros(2 * degree + 1)  # sum t^k, t = (x - center) / scale
+        self.xy = np.zeros(degree + 1)  # sum y t^k
+        self.yy = 0.0
+
+    @property
+    def n(self):
+        return int(round(self.moments[0]))
+
+    def powers(self, x, k):
+        """t^0 .. t^(k-1) of x as columns, shape (len(x), k)"""
+        t = np.empty((len(x), k))
+        t[:, 0] = 1
+        if k > 1:
+            t[:, 1] = (np.asarray(x, dtype=float) - self.center) / self.scale
+        for j in range(2, k):  # Repeated products are much faster than a power ufunc
+            np.multiply(t[:, j - 1], t[:, 1], out=t[:, j])
+        return t
+
+    def add(self, moments, xy, yy):
+        """Add precomputed sums"""
+        self.moments += moments
+        self.xy += xy
+        self.yy += yy
+
+    def update(self, x, y):
+        """Add observations; rows with a missing x or y are skipped"""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        t = self.powers(x, 2 * self.degree + 1)
+        self.add(t.sum(axis=0), y @ t[:, :self.degree + 1], float(y @ y))
+        return self
+
+    def merge(self, other):
+        """Add the observations of another fit with the same degree, center and scale"""
+        if (other.degree, other.center, other.scale) != (self.degree, self.center, self.scale):
+            raise ValueError("fits must share degree, center and scale to be merged")
+        self.add(other.moments, other.xy, other.yy)
+        return self
+
+    def _solve(self):
+        if self.n <= self.degree:
+            raise ValueError(f"degree {self.degree} fit needs more than {self.degree} points, has {self.n}")
+        d = self.degree + 1
+        gram = self.moments[np.add.outer(np.arange(d), np.arange(d))]
+        return np.linalg.lstsq(gram, self.xy, rcond=None)[0]
+
+    def poly(self):
+        """The fitted polynomial in x"""
+        beta = self._solve()
+        t = np.poly1d([1 / self.scale, -self.center / self.scale])
+        return np.poly1d(beta[::-1])(t)
+
+    def coeffs(self):
+        """Coefficients in x, highest power first (np.polyfit order)"""
+        coeffs = self.poly().coeffs
+        return np.pad(coeffs, (self.degree + 1 - len(coeffs), 0))
+
+    def rss(self):
+        """Residual sum of squares"""
+        return max(self.yy - float(self._solve() @ self.xy), 0.0)
+
+    def r2(self):
+        """Coefficient of determination"""
+        total = self.yy - self.xy[0] ** 2 / self.n
+        return 1 - self.rss() / total if total > 0 else float('nan')
+
+    def to_dict(self):
+        return {'degree': self.degree, 'center': self.center, 'scale': self.scale,
+                'moments': self.moments.tolist(), 'xy': self.xy.tolist(), 'yy': self.yy}
+
+    @classmethod
+    def from_dict(cls, d):
+        fit = cls(d['degree'], d['center'], d['scale'])
+        fit.moments = np.array(d['moments'], dtype=float)
+        fit.xy = np.array(d['xy'], dtype=float)
+        fit.yy = float(d['yy'])
+        return fit
+
+
+class GroupedFit:
+    """A PolyFit over all observations plus one per category, all on a shared x scale.
+
+    center and scale default to the mean and standard deviation of x in the first
+    update and stay fixed after that.
+    """
+
+    def __init__(self, degree=2, center=None, scale=None):
+        self.degree = degree
+        self.center = center
+        self.scale = scale
+        self.overall = None
+        self.categories = {}
+
+    def _new_fit(self):
+        return PolyFit(self.degree, self.center, self.scale)
+
+    def update(self, x, y, categories=None):
+        """Add a chunk of observations, with an optional category label per row"""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        if self.overall is None:
+            if not len(x):
+                return self
+            if self.center is None:
+                self.center = float(np.mean(x))
+            if self.scale is None:
+                self.scale = float(np.std(x)) or 1.0
+            self.overall = self._new_fit()
+        if categories is None:
+            self.overall.update(x, y)
+            return self
+
+        # Per-category sums for the whole chunk at once; the overall sums are their total.
+        # Rows without a category go to an extra last bin that only counts overall.
+        import pandas as pd
+        inverse, labels = pd.factorize(np.asarray(categories, dtype=object)[keep])
+        labels = [str(label) for label in labels]
+        n_bins = len(labels) + 1
+        inverse[inverse < 0] = len(labels)
+        t = self.overall.powers(x, 2 * self.degree + 1)
+        moments = np.column_stack([np.bincount(inverse, weights=col, minlength=n_bins) for col in t.T])
+        xy = np.column_stack([np.bincount(inverse, weights=y * col, minlength=n_bins)
+                              for col in t[:, :self.degree + 1].T])
+        yy = np.bincount(inverse, weights=y * y, minlength=n_bins)
+        self.overall.add(moments.sum(axis=0), xy.sum(axis=0), float(yy.sum()))
+        for j, label in enumerate(labels):
+            if label not in self.categories:
+                self.categories[label] = self._new_fit()
+            self.categories[label].add(moments[j], xy[j], yy[j])
+        return self
+
+    def merge(self, other):
+        """Add the observations of another GroupedFit on the same x scale"""
+        if other.overall is None:
+            return self
+        if self.overall is None:
+            self.center, self.scale = other.center, other.scale
+            self.overall = self._new_fit()
+        self.overall.merge(other.overall)
+        for label, fit in other.categories.items():
+            self.categories.setdefault(label, self._new_fit()).merge(fit)
+        return self
+
+    def save(self, filename):
+        state = {'degree': self.degree, 'center': self.center, 'scale': self.scale,
+                 'overall': self.overall.to_dict() if self.overall else None,
+                 'categories': {label: fit.to_dict() for label, fit in self.categories.items()}}
+        with open(filename, 'w') as f:
+            json.dump(state, f, indent=1)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            state = json.load(f)
+        fit = cls(state['degree'], state['center'], state['scale'])
+        fit.overall = PolyFit.from_dict(state['overall']) if state['overall'] else None
+        fit.categories = {label: PolyFit.from_dict(d) for label, d in state['categories'].items()}
+        return fit
+
+
+def iter_observations(filename, x_column=X_COLUMN, y_column=Y_COLUMN, category_column=CATEGORY_COLUMN,
+                      chunksize=CHUNK_ROWS):
+    """Stream (x, y, categories) arrays from a CSV, reading only those columns"""
+    import pandas as pd
+
+    columns = [x_column, y_column] + ([category_column] if category_column else [])
+    for df in pd.read_csv(filename, usecols=columns, chunksize=chunksize,
+                          dtype={x_column: float, y_column: float}):
+        categories = df[category_column].to_numpy() if category_column else None
+        yield df[x_column].to_numpy(), df[y_column].to_numpy(), categories
+
+
+def fit_files(filenames, degree=2, fit=None, x_column=X_COLUMN, y_column=Y_COLUMN,
+              category_column=CATEGORY_COLUMN, chunksize=CHUNK_ROWS):
+    """Fit (or continue fitting) the observations in the given CSV files"""
+    fit = fit or GroupedFit(degree)
+    for filename in filenames:
+        for x, y, categories in iter_observations(filename, x_column, y_column, category_column, chunksize):
+            fit.update(x, y, categories)
+    return fit
+
+
+def format_poly(poly, var='x'):
+    """'1.234x² + 5.678x + 9.012' style equation"""
+    powers = {2: '²', 3: '³'}
+    terms = []
+    for k, c in zip(range(poly.order, -1, -1), poly.coeffs):
+        term = f"{c:.3f}" + (var if k else '') + (powers.get(k, f"^{k}") if k > 1 else '')
+        terms.append(term)
+    return ' + '.join(terms).replace('+ -', '- ')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming polynomial fit of y against x, per category")
+    parser.add_argument('files', nargs='*', default=['data_tools.csv'])
+    parser.add_argument('-d', '--degree', type=int, default=2)
+    parser.add_argument('-x', default=X_COLUMN, help="x column")
+    parser.add_argument('-y', default=Y_COLUMN, help="y column")
+    parser.add_argument('-c', '--category', default=CATEGORY_COLUMN, help="category column ('' for none)")
+    parser.add_argument('--state', help="JSON file of sums to resume from and update")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    fit = None
+    if args.state:
+        try:
+            fit = GroupedFit.load(args.state)
+        except FileNotFoundError:
+            pass
+    fit = fit_files(args.files, args.degree, fit, args.x, args.y, args.category or None, args.chunksize)
+    if args.state:
+        fit.save(args.state)
+
+    for label, f in [('Overall', fit.overall)] + sorted(fit.categories.items()):
+        if f is None or f.n <= f.degree:
+            print(f"{label:<24} n={f.n if f else 0:<6} too few points")
+            continue
+        print(f"{label:<24} n={f.n:<6} R²={f.r2():.3f}  y = {format_poly(f.poly())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Local HTTP server for sword plots, built on demand.
+
+    GET /                     index page
+    GET /swords               JSON list of sword names (swords with a ROG, which can be plotted)
+    GET /sword/<name>.json    figure JSON
+    GET /sword/<name>.html    figure page (uses /plotly.min.js)
+    GET /plotly.min.js
+
+Built figures are kept, already encoded, in a bounded LRU cache. Concurrent requests
+for a sword that is still being built wait for that one build instead of starting
+their own.
+"""
+import argparse
+import html
+import json
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from swords import Catalog
+
+CACHE_SIZE = 256  # Figures kept in memory
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<script src="/plotly.min.js"></script></head>
+<body style="margin:0"><div id="plot"></div>
+<script>var fig = {figure}; Plotly.newPlot('plot', fig.data, fig.layout);</script>
+</body></html>
+"""
+
+
+class LRUCache:
+    """Thread-safe LRU cache where concurrent misses on one key share a single build"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.shared = 0
+
+    def get(self, key, build):
+        """Cached value for key, calling build() at most once across waiting threads"""
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self.pending[key] = Future()
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = build()
+        except BaseException as e:
+            with self.lock:
+                del self.pending[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.items[key] = value
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+            del self.pending[key]
+        future.set_result(value)
+        return value
+
+
+class PlotServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog, cache_size=CACHE_SIZE, verbose=False):
+        super().__init__(address, PlotHandler)
+        self.catalog = catalog
+        self.verbose = verbose
+        self.figures = LRUCache(cache_size)
+        self.swords_json = json.dumps([str(catalog.table.names[row]) for row in self.plottable()]).encode()
+        self._plotlyjs = None
+
+    @property
+    def plotlyjs(self):
+        if self._plotlyjs is None:
+            from plotly.offline import get_plotlyjs
+            self._plotlyjs = get_plotlyjs().encode()
+        return self._plotlyjs
+
+    def plottable(self):
+        """Rows with a ROG; the others are left out of the index and /swords"""
+        return [row for row, rog in enumerate(self.catalog.table.rog) if math.isfinite(rog)]
+
+    def figure(self, row):
+        """(json, html) bytes of the figure for a catalog row"""
+        return self.figures.get(row, lambda: self.build(row))
+
+    def build(self, row):
+        from dbp_plot import build_figure
+
+        sword = self.catalog.table.sword(row)
+        figure = build_figure(sword, verbose=False).to_json()
+        page = PAGE.format(title=html.escape(sword.name), figure=figure)
+        return figure.encode(), page.encode()
+
+    def index(self):
+        links = '\n'.join(
+            f'<li><a href="/sword/{quote(str(name).strip(), safe="")}.html">{html.escape(str(name).strip())}</a></li>'
+            for name in (self.catalog.table.names[row] for row in self.plottable()))
+        return f"<!DOCTYPE html><html><body><ul>\n{links}\n</ul></body></html>".encode()
+
+
+class PlotHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections open between requests
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            return self.send(self.server.index(), 'text/html; charset=utf-8')
+        if path == '/swords':
+            return self.send(self.server.swords_json, 'application/json')
+        if path == '/plotly.min.js':
+            return self.send(self.server.plotlyjs, 'application/javascript', cache=True)
+        if path.startswith('/sword/'):
+            name, _, ext = unquote(path[len('/sword/'):]).rpartition('.')
+            row = self.server.catalog.find(name)
+            if row is None or ext not in ('json', 'html'):
+                return self.send_error(404)
+            if not math.isfinite(self.server.catalog.table.rog[row]):
+                return self.send_error(422, "Sword has no ROG (no complete measurement pair)")
+            try:
+                figure, page = self.server.figure(row)
+            except Exception as e:
+                return self.send_error(500, f"Could not build the figure: {e}")
+            if ext == 'json':
+                return self.send(figure, 'application/json')
+            return self.send(page, 'text/html; charset=utf-8')
+        self.send_error(404)
+
+    def send(self, body, content_type, cache=False):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cache:
+            self.send_header('Cache-Control', 'max-age=86400')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(csv_file='data_swords.csv', host='127.0.0.1', port=8050, cache_size=CACHE_SIZE, verbose=False):
+    server = PlotServer((host, port), Catalog.load(csv_file), cache_size, verbose)
+    print(f"Serving {len(server.catalog)} swords on http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sword plots over HTTP")
+    parser.add_argument('csv', nargs='?', default='data_swords.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=8050)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="figures kept in memory")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+    serve(args.csv, args.host, args.port, args.cache_size, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Find the catalog swords that handle most like a given one.
+
+Each sword becomes a feature vector of the positions add_dynamics_visualization
+draws (com, rog, center of percussion, pommel pivot and tip pivot), divided by the
+sword's length so blades of different sizes compare by proportion, plus a scaled
+log mass. A KD-tree over those vectors answers k-nearest and radius queries.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from swords import conjugate_point
+
+# Weight of log(mass) against the length-normalized positions: a 10% heavier sword is
+# as far away as a ~1% of length shift in one position
+MASS_WEIGHT = 0.1
+FEATURES = ['com', 'rog', 'cop', 'pommel_pivot', 'tip_pivot', 'log_mass']
+
+
+def feature_matrix(table, mass_weight=MASS_WEIGHT):
+    """(n, len(FEATURES)) handling features of every row; rows without a ROG are NaN"""
+    com, rog, length = table.com, table.rog, table.length
+    with np.errstate(invalid='ignore', divide='ignore'):
+        positions = np.column_stack([
+            com,
+            rog,
+            table.cop,
+            conjugate_point(com, rog, table.pommel),
+            conjugate_point(com, rog, length),
+        ]) / length[:, None]
+        log_mass = mass_weight * np.log(table.mass)
+    return np.column_stack([positions, log_mass])
+
+
+class FeelIndex:
+    """KD-tree over the handling features of a SwordTable"""
+
+    def __init__(self, table, mass_weight=MASS_WEIGHT):
+        self.table = table
+        self.mass_weight = mass_weight
+        features = feature_matrix(table, mass_weight)
+        self.rows = np.flatnonzero(np.isfinite(features).all(axis=1))
+        self.features = features[self.rows]
+        self.tree = cKDTree(self.features)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, row):
+        """Whether row is indexed (it has a ROG)"""
+        i = np.searchsorted(self.rows, row)
+        return bool(i < len(self.rows) and self.rows[i] == row)
+
+    def _row_features(self, row):
+        i = np.searchsorted(self.rows, row)
+        if i < len(self.rows) and self.rows[i] == row:
+            return self.features[i]
+        raise ValueError(f"row {row} has no ROG and is not indexed")
+
+    def nearest(self, row, k=5):
+        """The k rows handling most like row (excluding itself) as (rows, distances)"""
+        distances, idx = self.tree.query(self._row_features(row), k=min(k + 1, len(self.rows)))
+        found = self.rows[np.atleast_1d(idx)]
+        keep = found != row
+        return found[keep][:k], np.atleast_1d(distances)[keep][:k]
+
+    def within(self, row, radius):
+        """Rows (excluding row) within radius in feature space, nearest first, as (rows, distances)"""
+        center = self._row_features(row)
+        idx = np.array(self.tree.query_ball_point(center, radius), dtype=int)
+        distances = np.linalg.norm(self.features[idx] - center, axis=1)
+        order = np.argsort(distances)
+        found, distances = self.rows[idx[order]], distances[order]
+        keep = found != row
+        return found[keep], distances[keep]
+
+    def query(self, features, k=5):
+        """Nearest rows to arbitrary feature vectors, shape (m, len(FEATURES)), as (rows, distances).
+
+        k is clamped to the number of indexed rows.
+        """
+        features = np.atleast_2d(features)
+        k = min(k, len(self.rows))
+        if k < 1:
+            return np.empty((len(features), 0), dtype=int), np.empty((len(features), 0))
+        distances, idx = self.tree.query(features, k=k)
+        return self.rows[idx], distances
@@ -0,0 +1,149 @@
+"""Static SVG thumbnails of swords, for the gallery index.
+
+Thumbnails are written straight from the plot geometry (circles.py) and theme, with
+no plotly and no browser: blade, hilt and crossguard, the ROG and pivot circles, the
+ROG lines, and the COM and dynamic balance points. Circles are SVG <circle> elements
+clipped by the view box instead of sampled arcs, so a thumbnail is a few dozen
+elements and about 1 KB. The circles of a whole batch of swords are computed with
+array operations, and batches are rendered in parallel.
+
+    python svg_thumbs.py data_swords.csv -o thumbs
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from astro_colors import theme
+from circles import NAMED_PIVOTS, STATIC_GEOMETRY, VIEW_BOX, circle_params, named_pivots, visible_arcs
+from swords import GRIP, SwordTable
+
+THUMB_WIDTH = 240  # px; the height follows the view box
+LINE_SCALE = 0.5  # Line widths and marker sizes relative to the full plot
+BATCH = 500  # Swords per worker task
+COLUMNS = ['com', 'rog', 'length', 'pommel', 'rog_grip']
+
+# Circles drawn, as (pivot, color, plot line width), under the sword's own lines
+CIRCLES = [
+    ('rog', theme['rog'], 2),
+    ('tip', theme['tip'], 1),
+    ('target', theme['target'], 1),
+    ('pommel', theme['pommel'], 1),
+    ('rog_grip', theme['rog_grip'], 1),
+]
+
+
+def _size(px):
+    """Plot px (line width or marker size) in view box units of the thumbnail"""
+    return px * LINE_SCALE * (VIEW_BOX[1] - VIEW_BOX[0]) / THUMB_WIDTH
+
+
+def thumbnail_columns(table, rows):
+    """The table columns a thumbnail needs, for the given rows"""
+    rows = np.asarray(rows, dtype=int)
+    columns = {name: np.asarray(getattr(table, name), dtype=float)[rows] for name in COLUMNS}
+    columns['name'] = [str(name).strip() for name in table.names[rows]]
+    return columns
+
+
+def thumbnail_svgs(columns):
+    """SVG document of every sword in columns (see thumbnail_columns)"""
+    com, rog = columns['com'], columns['rog']
+    n = len(com)
+    pivots = np.array(named_pivots(com, rog, columns['length'], columns['pommel'], columns['rog_grip']))
+    pivots = pivots[[NAMED_PIVOTS.index(pivot) for pivot, _, _ in CIRCLES]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        h, r = circle_params(com, rog, pivots)
+    shown = np.zeros(h.size, bool)
+    shown[visible_arcs(h.ravel(), r.ravel())[0]] = True
+    shown = shown.reshape(h.shape)
+
+    x_min, x_max, y_min, y_max = VIEW_BOX
+    height = round(THUMB_WIDTH * (y_max - y_min) / (x_max - x_min))
+    head = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{THUMB_WIDTH}" height="{height}" '
+            f'viewBox="{x_min} {-y_max} {x_max - x_min} {y_max - y_min}">')
+    background = (f'<rect x="{x_min}" y="{-y_max}" width="{x_max - x_min}" height="{y_max - y_min}" '
+                  f'fill="{theme["background"]}"/>')
+    static = ''.join(f'<path d="M{x[0]:.1f} {-y[0]:.1f}L{x[1]:.1f} {-y[1]:.1f}" stroke-width="{_size(w):.2f}"/>'
+                     for _, x, y, w in STATIC_GEOMETRY)
+
+    svgs = []
+    for i in range(n):
+        c, k = com[i], rog[i]
+        parts = [head, f'<title>{html.escape(columns["name"][i])}</title>', background, '<g fill="none">']
+        for j, (_, color, width) in enumerate(CIRCLES):
+            if shown[j, i]:
+                parts.append(f'<circle cx="{h[j, i]:.1f}" cy="0" r="{r[j, i]:.1f}" stroke="{color}" '
+                             f'stroke-width="{_size(width):.2f}"/>')
+        parts.append(f'</g><g stroke="{theme["sword"]}">')
+        parts.append(f'<path d="M0 0H{columns["length"][i]:.1f}" stroke-width="{_size(8):.2f}"/>')
+        parts.append(f'<path d="M{columns["pommel"][i]:.1f} 0H0" stroke-width="{_size(5):.2f}"/>')
+        parts.append(static + '</g>')
+        if np.isfinite(k):
+            parts.append(f'<path d="M{GRIP:.1f} 0L{c:.1f} {k:.1f}" stroke="{theme["rog_grip"]}" '
+                         f'stroke-width="{_size(2):.2f}"/>')
+            parts.append(f'<path d="M{c:.1f} 0V{-k:.1f}" stroke="{theme["rog"]}" stroke-width="{_size(2):.2f}"/>')
+            for y in (-k, k):
+                parts.append(f'<circle cx="{c:.1f}" cy="{y:.1f}" r="{_size(6) / 2:.2f}" fill="{theme["rog"]}"/>')
+        parts.append(f'<circle cx="{c:.1f}" cy="0" r="{_size(8) / 2:.2f}" fill="{theme["com"]}"/>')
+        parts.append('</svg>\n')
+        svgs.append(''.join(parts))
+    return svgs
+
+
+def _render_batch(batch):
+    """Pool worker: write the thumbnails of one batch, returning the bytes written"""
+    columns, paths = batch
+    total = 0
+    for svg, path in zip(thumbnail_svgs(columns), paths):
+        data = svg.encode()
+        with open(path, 'wb') as f:
+            f.write(data)
+        total += len(data)
+    return total
+
+
+def render_thumbnails(table, rows, paths, workers=None):
+    """Write the thumbnail of each table row to its path, in parallel batches.
+
+    Returns the number of bytes written.
+    """
+    columns = thumbnail_columns(table, rows)
+    batches = [({name: values[s:s + BATCH] for name, values in columns.items()}, paths[s:s + BATCH])
+               for s in range(0, len(paths), BATCH)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) <= 1:
+        return sum(_render_batch(batch) for batch in batches)
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        return sum(pool.map(_render_batch, batches))
+
+
+def write_thumbnails(csv_file='data_swords.csv', out_dir='thumbs', patterns=None, workers=None):
+    """Thumbnail of every (matching) sword in a catalog CSV or columnar directory, named like the gallery pages"""
+    from gallery import assign_filenames, select_rows
+
+    start = time.perf_counter()
+    table = SwordTable.load(csv_file)
+    rows = select_rows(table, patterns)
+    os.makedirs(out_dir, exist_ok=True)
+    names = assign_filenames([str(name) for name in table.names])  # Whole catalog, like the gallery
+    paths = [os.path.join(out_dir, os.path.splitext(names[i])[0] + '.svg') for i in rows]
+    total = render_thumbnails(table, rows, paths, workers)
+    print(f"Wrote {len(paths)} thumbnails to {out_dir}/ in {time.perf_counter() - start:.2f} s, {total / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write an SVG thumbnail of every sword, without plotly")
+    parser.add_argument('csv', nargs='?', default='data_swords.csv', help="catalog CSV or columnar directory")
+    parser.add_argument('-o', '--out', default='thumbs', help="output directory")
+    parser.add_argument('-m', '--match', action='append', help="only swords matching this name glob (repeatable)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    write_thumbnails(args.csv, args.out, args.match, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+import bisect
+import json
+import math
+import os
+import re
+import numpy as np
+
+# Input columns of data_swords.csv (besides name and the pair_N measurement columns)
+FIELDS = ['mass', 'grip_ref', 'cog_ref', 'hilt_ext', 'blade_ext', 'lever_ref']
+GRIP = -4.5  # Middle of hand approximately, relative to grip_ref
+CHUNK_ROWS = 100_000  # Rows per chunk when streaming large catalogs
+COLUMNAR_VERSION = 3  # Bump when the columnar catalog layout changes
+DERIVED = ['lever', 'length', 'com', 'pommel', 'rog']  # Stored alongside FIELDS in columnar catalogs
+PRECOMPUTED = ['cop', 'rog_grip']  # Properties that columnar catalogs also store
+
+
+class Sword:
+    __slots__ = ('mass', 'grip_ref', 'cog_ref', 'hilt_ext', 'blade_ext', 'lever_ref', 'name',
+                 'grip', 'lever', 'length', 'com', 'pommel', 'rog', 'pairs')
+
+    def __init__(self, mass, grip_ref, cog_ref, hilt_ext, blade_ext, lever_ref, name="Unnamed"):
+        self.mass = float(mass)
+        self.grip_ref = float(grip_ref)
+        self.cog_ref = float(cog_ref)
+        self.hilt_ext = float(hilt_ext)
+        self.blade_ext = float(blade_ext)
+        self.lever_ref = float(lever_ref)
+        self.name = name
+
+        # Calculate derived properties relative to grip position
+        self.grip = GRIP
+        self.lever = self.lever_ref - self.grip_ref
+        self.length = self.blade_ext - self.grip_ref
+        self.com = self.cog_ref - self.grip_ref
+        self.pommel = self.hilt_ext - self.grip_ref
+        self.rog = None
+        self.pairs = []
+
+    def add_pair(self, point1, point2):
+        """Add measurement point pair for ROG calculation"""
+        point1 = point1 - self.grip_ref
+        point2 = point2 - self.grip_ref
+        self.pairs.append((point1, point2))
+
+    @property
+    def cop(self):
+        """Center of percussion for a hand at the grip"""
+        return center_of_percussion(self.com, self.rog, self.grip)
+
+    @property
+    def rog_grip(self):
+        """Radius of gyration around the grip, as a position along the sword"""
+        return rog_around_grip(self.com, self.rog, self.grip)
+
+
+def center_of_percussion(com, rog, grip=GRIP):
+    """Center of percussion for a hand at grip (works on scalars or arrays)"""
+    return com + rog**2 / (com - grip)
+
+
+def rog_around_grip(com, rog, grip=GRIP):
+    """Radius of gyration around grip, offset to a position along the sword"""
+    return np.sqrt((com - grip) ** 2 + rog**2) + grip
+
+
+def conjugate_point(com, rog, point):
+    """Point on the axis conjugate to point: the other crossing of its Hudgins circle"""
+    return com - rog**2 / (point - com)
+
+
+def rog_from_pair(com, point1, point2):
+    """Calculate radius of gyration from measurement pair"""
+    d1 = com - point1
+    d2 = point2 - com
+    return math.sqrt(d1 * d2)
+
+
+def rog_from_pairs(com, pairs):
+    """Vectorized ROG: geometric mean of rog_from_pair over each row's pairs, ignoring NaN pairs.
+
+    com: (n,) centers of mass, pairs: (n, 2k) points relative to grip_ref laid out as
+    point1, point2, point1, point2, ... An unmatched last column is ignored. Rows without
+    any complete pair get NaN.
+    """
+    com = np.asarray(com, dtype=float)[:, None]
+    pairs = np.asarray(pairs, dtype=float)
+    pairs = pairs[:, :pairs.shape[1] - pairs.shape[1] % 2]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_rogs = np.log(np.sqrt((com - pairs[:, 0::2]) * (pairs[:, 1::2] - com)))
+        n = np.sum(~np.isnan(log_rogs), axis=1)
+        return np.exp(np.nansum(log_rogs, axis=1) / n)
+
+
+def pack_pairs(pairs):
+    """Measurement points of each row packed for pairing, the way the per-row CSV loader paired them.
+
+    The non-NaN points of a row move to the front in column order and pair up
+    consecutively, so a gap in a row does not shift the pairing; an unpaired last
+    point is dropped, so an odd number of pair_N columns is fine.
+    """
+    pairs = np.asarray(pairs, dtype=float)
+    missing = np.isnan(pairs)
+    if missing.any():
+        pairs = np.take_along_axis(pairs, np.argsort(missing, axis=1, kind='stable'), axis=1)
+    return pairs[:, :pairs.shape[1] - pairs.shape[1] % 2]
+
+
+class StringColumn:
+    """Read-only column of strings stored as UTF-8 bytes plus row offsets.
+
+    Row i is data[offsets[i]:offsets[i + 1]], decoded on access, so a memory-mapped
+    column opens for free and a long name costs only its own bytes. Indexing with
+    an int gives a str, with a slice or index array an object array.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [str(s).encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            i = range(len(self))[i]
+            return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+        return np.array([self[j] for j in np.arange(len(self))[i]], dtype=object)
+
+    def __iter__(self):
+        data = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode()
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(list(self), dtype=object if dtype is None else dtype)
+
+
+class SwordTable:
+    """Columnar sword catalog: one NumPy array per field plus a 2-D pair matrix.
+
+    Derived quantities (com, pommel, length, lever, rog) are computed for all rows at
+    once. Sword objects are only built on request with sword() or to_swords().
+    """
+
+    def __init__(self, names, mass, grip_ref, cog_ref, hilt_ext, blade_ext, lever_ref, pairs, rog=None):
+        self.names = np.asarray(names, dtype=object)
+        self.mass = np.asarray(mass, dtype=float)
+        self.grip_ref = np.asarray(grip_ref, dtype=float)
+        self.cog_ref = np.asarray(cog_ref, dtype=float)
+        self.hilt_ext = np.asarray(hilt_ext, dtype=float)
+        self.blade_ext = np.asarray(blade_ext, dtype=float)
+        self.lever_ref = np.asarray(lever_ref, dtype=float)
+        pairs = np.asarray(pairs, dtype=float)
+        self.pairs = pack_pairs(pairs.reshape(len(self.names), -1 if len(self.names) else 0))
+
+        # Derived properties relative to grip position
+        self.grip = GRIP
+        self.lever = self.lever_ref - self.grip_ref
+        self.length = self.blade_ext - self.grip_ref
+        self.com = self.cog_ref - self.grip_ref
+        self.pommel = self.hilt_ext - self.grip_ref
+        self.rog = rog_from_pairs(self.com, self.pairs - self.grip_ref[:, None]) if rog is None else np.asarray(rog, dtype=float)
+        self._cop = self._rog_grip = None  # Precomputed by columnar catalogs
+        self._name_index = None  # Persisted by columnar catalogs
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def cop(self):
+        """Center of percussion of every row for a hand at the grip"""
+        if self._cop is not None:
+            return self._cop
+        return center_of_percussion(self.com, self.rog, self.grip)
+
+    @property
+    def rog_grip(self):
+        """Radius of gyration around the grip of every row, as a position along the sword"""
+        if self._rog_grip is not None:
+            return self._rog_grip
+        return rog_around_grip(self.com, self.rog, self.grip)
+
+    @classmethod
+    def from_columns(cls, columns, start=0):
+        """Build a table from a DataFrame or dict of columns with the data_swords.csv names.
+
+        start is the row number of the first row, used for default names of unnamed swords.
+        """
+        n = len(columns[FIELDS[0]])
+        names = np.asarray(columns['name'], dtype=object) if 'name' in columns else np.array([f'Sword_{start+i+1}' for i in range(n)], dtype=object)
+        pair_cols = pair_columns(list(columns))
+        pairs = np.column_stack([np.asarray(columns[col], dtype=float) for col in pair_cols]) if pair_cols else np.empty((n, 0))
+        return cls(names, *(np.asarray(columns[field], dtype=float) for field in FIELDS), pairs)
+
+    from_dataframe = from_columns
+
+    @classmethod
+    def from_csv(cls, filename, engine='pandas'):
+        """Load a sword catalog CSV into a table.
+
+        engine='csv' parses with the standard library instead of pandas, which starts
+        much faster for small files.
+        """
+        if engine == 'csv':
+            return cls.from_columns(read_csv_columns(filename))
+        import pandas as pd
+        return cls.from_columns(pd.read_csv(filename))
+
+    @classmethod
+    def from_columnar(cls, directory, mmap=True):
+        """Open a catalog written by write_columnar.
+
+        With mmap the arrays are memory-mapped read-only, so opening is nearly free
+        and processes reading the same catalog share its pages.
+        """
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != COLUMNAR_VERSION:
+            raise ValueError(f"{directory}: columnar catalog version {meta.get('version')}, expected {COLUMNAR_VERSION}")
+
+        def column(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mmap else None)
+
+        table = cls.__new__(cls)
+        table.names = StringColumn(column('name_offsets'), column('name_bytes'))
+        for field in FIELDS + DERIVED + ['pairs']:
+            setattr(table, field, column(field))
+        table.grip = meta['grip']
+        table._cop, table._rog_grip = column('cop'), column('rog_grip')
+        table._name_index = NameIndex(table.names, column('name_rows'), column('key_rows'))
+        return table
+
+    @classmethod
+    def load(cls, path, engine='pandas'):
+        """Load a catalog CSV, or open a columnar catalog directory"""
+        if os.path.isdir(path):
+            return cls.from_columnar(path)
+        return cls.from_csv(path, engine)
+
+    def write_columnar(self, directory, source=None):
+        """Write the table, including derived columns and the name index, as a directory of .npy files"""
+        os.makedirs(directory, exist_ok=True)
+        names = StringColumn.from_strings(self.names)
+        index = NameIndex.build(names)
+        columns = {'name_offsets': names.offsets, 'name_bytes': names.data, 'pairs': self.pairs,
+                   'name_rows': np.asarray(index.name_rows, dtype=np.int64),
+                   'key_rows': np.asarray(index.key_rows, dtype=np.int64)}
+        for field in FIELDS + DERIVED + PRECOMPUTED:
+            columns[field] = np.asarray(getattr(self, field), dtype=float)
+        for name, values in columns.items():
+            np.save(os.path.join(directory, f'{name}.npy'), values)
+        meta = {'version': COLUMNAR_VERSION, 'rows': len(self), 'grip': self.grip,
+                'columns': sorted(columns), 'source': source}
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+    def sword(self, i):
+        """Build the Sword object for row i"""
+        sword = Sword(
+            mass=self.mass[i],
+            grip_ref=self.grip_ref[i],
+            cog_ref=self.cog_ref[i],
+            hilt_ext=self.hilt_ext[i],
+            blade_ext=self.blade_ext[i],
+            lever_ref=self.lever_ref[i],
+            name=str(self.names[i])
+        )
+        for point1, point2 in self.pairs[i].reshape(-1, 2):
+            if not (np.isnan(point1) or np.isnan(point2)):
+                sword.add_pair(float(point1), float(point2))
+        rog = self.rog[i]
+        sword.rog = None if np.isnan(rog) else float(rog)
+        return sword
+
+    def to_swords(self):
+        """Build Sword objects for every row"""
+        return [self.sword(i) for i in range(len(self))]
+
+
+def normalize_name(name):
+    """Lookup key for a sword name: trimmed, case-folded, without leading '?' markers"""
+    return name.strip().lstrip('?').strip().casefold()
+
+
+class _SortedNames:
+    """Names in a given row order as a sequence, optionally through key(), for bisect"""
+
+    def __init__(self, names, rows, key=None):
+        self.names = names
+        self.rows = rows
+        self.key = key
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        name = str(self.names[self.rows[i]])
+        return self.key(name) if self.key else name
+
+
+class NameIndex:
+    """Name lookup by bisection over two row orders of a names column.
+
+    name_rows orders every row by exact name, key_rows every row by normalize_name();
+    rows with equal names keep catalog order, so a lookup finds the first occurrence.
+    Both are plain integer arrays, so columnar catalogs store them and open the index
+    for free.
+    """
+
+    def __init__(self, names, name_rows, key_rows):
+        self.name_rows = name_rows
+        self.key_rows = key_rows
+        self._names = _SortedNames(names, name_rows)
+        self._keys = _SortedNames(names, key_rows, normalize_name)
+
+    @classmethod
+    def build(cls, names):
+        names = [str(name) for name in names]
+        keys = [normalize_name(name) for name in names]
+        # Stable sorts: first occurrence first
+        name_rows = sorted(range(len(names)), key=names.__getitem__)
+        key_rows = sorted(range(len(keys)), key=keys.__getitem__)
+        return cls(names, name_rows, key_rows)
+
+    @staticmethod
+    def _first(sorted_names, rows, name):
+        i = bisect.bisect_left(sorted_names, name)
+        return int(rows[i]) if i < len(rows) and sorted_names[i] == name else None
+
+    def find(self, name):
+        """Row of the first sword with this name (exact, then normalized match), or None"""
+        row = self._first(self._names, self.name_rows, name)
+        if row is None:
+            row = self._first(self._keys, self.key_rows, normalize_name(name))
+        return row
+
+    def find_prefix(self, prefix, limit=None):
+        """Rows whose normalized name starts with prefix, in name order (every row of a
+        duplicated name, in catalog order)"""
+        prefix = normalize_name(prefix)
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + '\U0010ffff', lo)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [int(row) for row in self.key_rows[lo:hi]]
+
+
+class Catalog:
+    """SwordTable with a name index for exact, case-insensitive and prefix lookup.
+
+    Names are matched exactly first, then by normalize_name(), which ignores case,
+    surrounding whitespace and the leading '?' used to flag uncertain rows. The
+    index comes with columnar catalogs; for others it is built on the first lookup.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._index = table._name_index
+
+    @property
+    def index(self):
+        """The NameIndex, built on first use unless the table brought one"""
+        if self._index is None:
+            self._index = NameIndex.build(self.table.names)
+        return self._index
+
+    @classmethod
+    def from_csv(cls, filename, engine='pandas'):
+        """Load and index a sword catalog CSV"""
+        return cls(SwordTable.from_csv(filename, engine))
+
+    @classmethod
+    def load(cls, path, engine='pandas'):
+        """Load and index a catalog CSV or columnar catalog directory"""
+        return cls(SwordTable.load(path, engine))
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __getitem__(self, name):
+        row = self.find(name)
+        if row is None:
+            raise KeyError(name)
+        return self.table.sword(row)
+
+    def find(self, name):
+        """Row of the sword with this name (exact, then normalized match), or None"""
+        return self.index.find(name)
+
+    def lookup(self, name):
+        """Sword with this name, or None"""
+        row = self.find(name)
+        return None if row is None else self.table.sword(row)
+
+    def find_prefix(self, prefix, limit=None):
+        """Rows whose normalized name starts with prefix, in name order"""
+        return self.index.find_prefix(prefix, limit)
+
+    def lookup_prefix(self, prefix, limit=None):
+        """Swords whose name starts with prefix, in name order"""
+        return [self.table.sword(row) for row in self.find_prefix(prefix, limit)]
+
+
+def pair_columns(columns):
+    """The pair_N columns in numeric order (pair_2 before pair_10)"""
+    pairs = [col for col in columns if re.fullmatch(r'pair_\d+', col)]
+    return sorted(pairs, key=lambda col: int(col[5:]))
+
+
+def read_csv_columns(filename):
+    """Read a catalog CSV into a dict of columns with the standard library csv module"""
+    import csv
+
+    with open(filename, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    return columns_from_rows(header, rows)
+
+
+def columns_from_rows(header, rows):
+    """Dict of columns from already split CSV rows, converting the numeric fields"""
+    header = [col.strip() for col in header]
+    numeric = set(FIELDS) | set(pair_columns(header))
+    columns = {}
+    for j, col in enumerate(header):
+        values = [row[j] if j < len(row) else '' for row in rows]
+        if col in numeric:
+            values = [float(v) if v.strip() else math.nan for v in values]
+        columns[col] = values
+    return columns
+
+
+def iter_tables(filename, chunksize=CHUNK_ROWS, progress=None):
+    """Stream a catalog CSV as SwordTable chunks of at most chunksize rows.
+
+    Only one chunk is held at a time, so memory stays flat for any file size. Any
+    number of pair_N columns is accepted, odd or even; every chunk packs its rows'
+    points with pack_pairs, so rows pair the same whatever chunk they land in.
+    progress(rows_done) is called after each chunk.
+    """
+    import pandas as pd
+
+    columns = pd.read_csv(filename, nrows=0).columns
+    dtypes = {col: float for col in list(FIELDS) + pair_columns(columns)}
+    done = 0
+    for df in pd.read_csv(filename, chunksize=chunksize, dtype=dtypes):
+        table = SwordTable.from_dataframe(df, start=done)
+        done += len(table)
+        yield table
+        if progress:
+            progress(done)
+
+
+def iter_swords(filename, chunksize=CHUNK_ROWS, progress=None):
+    """Stream Sword objects from a catalog CSV; progress(rows_done) is called per sword"""
+    done = 0
+    for table in iter_tables(filename, chunksize):
+        for i in range(len(table)):
+            done += 1
+            yield table.sword(i)
+            if progress:
+                progress(done)
+
+
+def load_swords_from_csv(filename, progress=None):
+    """Load sword data from CSV and return list of Sword objects"""
+    return list(iter_swords(filename, progress=progress))
@@ -0,0 +1,49 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from server import PlotServer
+from swords import Catalog, SwordTable
+
+
+@pytest.fixture
+def server():
+    table = SwordTable.from_csv('data_swords.csv')
+    no_pairs = SwordTable(['No Pairs'], [1200], [20], [30], [0], [100], [5], np.full((1, 4), np.nan))
+    columns = [np.concatenate([getattr(table, f), getattr(no_pairs, f)])
+               for f in ['names', 'mass', 'grip_ref', 'cog_ref', 'hilt_ext', 'blade_ext', 'lever_ref']]
+    catalog = Catalog(SwordTable(*columns, np.vstack([table.pairs, no_pairs.pairs])))
+    server = PlotServer(('127.0.0.1', 0), catalog)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.status, response.read()
+
+
+def test_sword_without_rog_gets_422(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(f"{server}/sword/No%20Pairs.json")
+    assert error.value.code == 422
+
+
+def test_sword_without_rog_is_not_listed(server):
+    _, names = get(f"{server}/swords")
+    _, index = get(f"{server}/")
+    assert 'No Pairs' not in json.loads(names)
+    assert 'Albion Crecy' in json.loads(names)
+    assert b'No Pairs' not in index
+
+
+def test_sword_figure(server):
+    status, body = get(f"{server}/sword/albion%20crecy.json")
+    assert status == 200 and json.loads(body)['data']
@@ -0,0 +1,34 @@
+import numpy as np
+
+from swords import Catalog, NameIndex, SwordTable
+
+NAMES = ['Foo', 'Bar', 'foo', '?Foo bar', 'Baz']
+
+
+def table(names=NAMES):
+    n = len(names)
+    return SwordTable(names, [1000] * n, [20] * n, [30] * n, [0] * n, [100] * n, [5] * n, np.full((n, 2), np.nan))
+
+
+def test_find_prefers_exact_then_first_normalized():
+    catalog = Catalog(table())
+    assert catalog.find('foo') == 2
+    assert catalog.find('FOO') == 0
+    assert catalog.find(' foo bar ') == 3
+    assert catalog.find('qux') is None
+
+
+def test_find_prefix_returns_every_duplicate_row():
+    catalog = Catalog(table())
+    assert catalog.find_prefix('foo') == [0, 2, 3]
+    assert catalog.find_prefix('FOO', limit=2) == [0, 2]
+    assert catalog.find_prefix('ba') == [1, 4]
+
+
+def test_columnar_index_matches_built_index(tmp_path):
+    table().write_columnar(tmp_path / 'cat')
+    loaded, built = Catalog.load(str(tmp_path / 'cat')), NameIndex.build(NAMES)
+    for name in NAMES + ['foo', 'b', 'f', 'zz']:
+        assert loaded.find(name) == built.find(name)
+        assert loaded.find_prefix(name) == built.find_prefix(name)
+    assert list(loaded.table.names) == NAMES
@@ -0,0 +1,25 @@
+import numpy as np
+
+from swords import SwordTable
+from tuning import QUANTITIES, add_mass, best_options, current_value, tune
+
+
+def test_no_mass_removed_past_the_pommel():
+    table = SwordTable.from_csv('data_swords.csv')
+    rows = np.arange(len(table))
+    for quantity in QUANTITIES:
+        for change in (-3.0, 3.0):
+            front = tune(table, rows, quantity, current_value(table, rows, quantity) + change)
+            removed = front.mass < 0
+            assert np.all(front.position[removed] >= table.pommel[front.rows[removed]] - 1e-9)
+
+
+def test_front_options_match_exact_point_mass():
+    table = SwordTable.from_csv('data_swords.csv')
+    front = tune(table, [0, 1], 'rog', [30.0, 19.0])
+    best = best_options(front, 0.05)
+    assert len(best) == 2
+    row, m, x = front.rows, front.mass, front.position
+    _, com, rog = add_mass(table.mass[row], table.com[row], table.rog[row], m, x)
+    np.testing.assert_allclose(front.rog, rog)
+    np.testing.assert_allclose(front.error, np.abs(rog - np.array([30.0, 19.0])[row]))
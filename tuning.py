@@ -0,0 +1,192 @@
+"""Balance tuning: which point mass on the hilt moves a sword's dynamics to a target.
+
+Adding mass m (negative to remove it) at position x to a sword of mass M, center of
+mass c and radius of gyration k gives
+
+    M' = M + m
+    c' = (M c + m x) / M'
+    k'^2 = (M (k^2 + (c - c')^2) + m (x - c')^2) / M'
+
+(parallel axis theorem). This is evaluated for every sword and every candidate on a
+grid of mass changes and hilt positions at once, as broadcast array operations in
+row chunks. Positions are fractions of the hilt from the pommel end (0) to grip_ref
+(1); negative fractions lie past the pommel, i.e. a longer pommel.
+
+For each sword the result is the Pareto front of |mass change| against the
+distance to the target: every option that gets closer to the target than all
+options with less mass change.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from swords import GRIP, Sword, center_of_percussion, conjugate_point
+
+MASS_STEPS = np.arange(0, 151, 5.0)  # Magnitudes of mass change, added or removed, in catalog mass units
+HILT_FRACTIONS = np.linspace(-0.2, 1, 25)  # Candidate positions along the hilt, 0 = pommel end, 1 = grip_ref
+CHUNK_VALUES = 1_000_000  # Candidates evaluated at once
+QUANTITIES = {
+    'rog': "Radius of Gyration",
+    'com': "Center of Mass",
+    'cop': "Center of Percussion",
+    'tip_pivot': "Pivot at Tip",  # Point conjugate to the tip: stays still when the tip pivots
+    'pommel_pivot': "Action at Pommel",  # Point conjugate to the pommel
+}
+
+TuningFront = namedtuple('TuningFront', ['rows', 'mass', 'position', 'com', 'rog', 'value', 'error'])
+TuningFront.__doc__ = """Pareto options of many swords, flattened, in order of increasing |mass| per sword.
+
+rows: table row of each option; mass: added mass (negative: removed); position:
+where it goes; com, rog: the modified sword's; value: the tuned quantity; error:
+|value - target|.
+"""
+
+
+def quantity_value(quantity, com, rog, length, pommel):
+    """Value of one of QUANTITIES (arrays broadcast)"""
+    if quantity == 'rog':
+        return rog
+    if quantity == 'com':
+        return com
+    if quantity == 'cop':
+        return center_of_percussion(com, rog, GRIP)
+    if quantity == 'tip_pivot':
+        return conjugate_point(com, rog, length)
+    if quantity == 'pommel_pivot':
+        return conjugate_point(com, rog, pommel)
+    raise ValueError(f"unknown quantity {quantity!r}, expected one of {list(QUANTITIES)}")
+
+
+def add_mass(mass, com, rog, m, x, dtype=float):
+    """(mass, com, rog) after adding point mass m at x; NaN where the result is not physical.
+
+    Computed as c' = c + mu d and k'^2 = (1 - mu) k^2 + (1 - mu) mu d^2 with
+    mu = m / M' and d = x - c, the formulas above rearranged so that only two
+    products span the whole candidate grid. dtype float32 halves the memory traffic
+    of large grids.
+    """
+    new_mass = np.asarray(mass + m, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mu = np.where(new_mass > 0, m / new_mass, np.nan)
+        d = np.asarray(x - com, dtype=dtype)
+        rog2 = ((1 - mu) * mu).astype(dtype) * (d * d)
+        rog2 += ((1 - mu) * rog ** 2).astype(dtype)
+        new_com = mu.astype(dtype) * d
+        new_com += np.asarray(com, dtype=dtype)
+        new_rog = np.sqrt(rog2, out=rog2) if isinstance(rog2, np.ndarray) else np.sqrt(rog2)
+        return np.where(new_mass > 0, new_mass, np.nan), new_com, new_rog
+
+
+def hilt_position(pommel, fraction):
+    """Position of a hilt fraction (0 = pommel end, 1 = grip_ref) relative to grip_ref"""
+    return pommel * (1 - fraction) + 0.0  # No -0 at grip_ref
+
+
+def current_value(table, rows, quantity):
+    """The quantity for the unmodified swords"""
+    rows = np.asarray(rows, dtype=int)
+    return quantity_value(quantity, table.com[rows], table.rog[rows], table.length[rows], table.pommel[rows])
+
+
+def tune(table, rows, quantity, target, steps=MASS_STEPS, fractions=HILT_FRACTIONS):
+    """TuningFront of the given table rows towards target (scalar, or one per row).
+
+    Every mass in ±steps at every fraction of the hilt is a candidate, except removing
+    mass past the pommel (fractions below 0), where the sword has no material; options
+    that leave the sword unphysical (mass or ROG^2 negative) are skipped. The grid
+    is evaluated in float32, the options on the front again in float64.
+    """
+    rows = np.asarray(rows, dtype=int)
+    target = np.broadcast_to(np.asarray(target, dtype=float), rows.shape)
+    steps = np.unique(np.abs(np.asarray(steps, dtype=float)))
+    fractions = np.asarray(fractions, dtype=float)
+    # Candidate axes: (|mass| level, sign, position, sword); swords last so that every
+    # broadcast operation runs over long contiguous rows
+    signed = (np.array([-1.0, 1.0])[None, :] * steps[:, None])[:, :, None, None]
+    per_level = 2 * len(fractions)
+    beyond_pommel = fractions < 0
+
+    parts = []
+    per_chunk = max(1, CHUNK_VALUES // (len(steps) * per_level))
+    for s in range(0, len(rows), per_chunk):
+        r = rows[s:s + per_chunk]
+        mass, com, rog, length, pommel = (getattr(table, name)[r]
+                                          for name in ('mass', 'com', 'rog', 'length', 'pommel'))
+        x = hilt_position(pommel, fractions[:, None])
+        _, new_com, new_rog = add_mass(mass, com, rog, signed, x, np.float32)
+        # Everything meeting the grid in float32 too, so no operation upcasts it
+        length, pommel, goal = (a.astype(np.float32) for a in (length, pommel, target[s:s + per_chunk]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            error = quantity_value(quantity, new_com, new_rog, length, pommel)
+            error -= goal
+        np.abs(error, out=error)
+        np.fmin(error, np.inf, out=error)  # NaN (unphysical) -> inf
+        error[:, 0, beyond_pommel] = np.inf  # Nothing to remove there
+        error = error.reshape(len(steps), per_level, len(r))
+
+        # Best option of every mass level, then the levels that beat all smaller ones
+        pick = np.argmin(error, axis=1).T
+        best = np.take_along_axis(error, pick.T[:, None, :], axis=1)[:, 0, :].T
+        previous = np.minimum.accumulate(np.c_[np.full(len(r), np.inf), best[:, :-1]], axis=1)
+        sword, level = np.nonzero((best < previous) & np.isfinite(best))
+        sign, position = np.divmod(pick[sword, level], len(fractions))
+        m = steps[level] * np.where(sign == 1, 1.0, -1.0) + 0.0  # No -0 for the unmodified sword
+        x = hilt_position(table.pommel[r][sword], fractions[position])
+        _, c2, k2 = add_mass(table.mass[r][sword], table.com[r][sword], table.rog[r][sword], m, x)
+        value = quantity_value(quantity, c2, k2, table.length[r][sword], table.pommel[r][sword])
+        parts.append(TuningFront(r[sword], m, x, c2, k2, value, np.abs(value - target[s:s + per_chunk][sword])))
+
+    if not parts:
+        return TuningFront(*(np.array([]) for _ in TuningFront._fields))
+    return TuningFront(*(np.concatenate(arrays) for arrays in zip(*parts)))
+
+
+def best_options(front, tolerance=0.0):
+    """Index into front of one option per sword: the least mass change within tolerance
+    of the target, or the closest option when none is"""
+    if not len(front.rows):
+        return np.array([], dtype=int)
+    # Fronts are ordered by |mass| per sword with decreasing error, so the first option
+    # within tolerance is the lightest and the last one is the closest
+    within = front.error <= tolerance
+    starts = np.r_[0, np.flatnonzero(np.diff(front.rows)) + 1]
+    ends = np.r_[starts[1:], len(front.rows)]
+    first_within = np.minimum.reduceat(np.where(within, np.arange(len(within)), len(within)), starts)
+    return np.where(first_within < ends, first_within, ends - 1)
+
+
+def modified_sword(sword, mass, position):
+    """Copy of a Sword with point mass added at position (relative to grip_ref).
+
+    Its ROG comes from the formulas above, so it has no measurement pairs.
+    """
+    new_mass, com, rog = add_mass(sword.mass, sword.com, sword.rog, mass, position)
+    tuned = Sword(new_mass, sword.grip_ref, com + sword.grip_ref, sword.hilt_ext, sword.blade_ext,
+                  sword.lever_ref, name=f"{sword.name.strip()} {mass:+.0f} at {position:.1f}")
+    tuned.rog = float(rog)
+    return tuned
+
+
+def plot_tuning(sword, mass, position, path):
+    """Write the original and the modified sword's plots side by side to one HTML page"""
+    from dbp_plot import build_figure, configure_plot_layout, scatter, theme
+
+    tuned = modified_sword(sword, mass, position)
+    figures = []
+    for s, title in [(sword, f"{sword.name.strip()} - original"),
+                     (tuned, f"{sword.name.strip()} - {mass:+.0f} at {position:.1f}")]:
+        fig = build_figure(s, verbose=False)
+        configure_plot_layout(fig, s, title=title)
+        figures.append(fig)
+    figures[1].add_trace(scatter(
+        x=[position], y=[0], mode='markers', name='Added mass' if mass > 0 else 'Removed mass',
+        marker=dict(color=theme['target'], size=12, symbol='x'), legendrank=0
+    ))
+    divs = [fig.to_html(include_plotlyjs=(i == 0), full_html=False) for i, fig in enumerate(figures)]
+    page = ('<!DOCTYPE html><html><head><meta charset="utf-8"></head>'
+            f'<body style="background: {theme["paper"]}; margin: 0">'
+            '<div style="display: flex; flex-wrap: wrap">' + ''.join(f'<div>{div}</div>' for div in divs)
+            + '</div></body></html>\n')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return tuned
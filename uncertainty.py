@@ -0,0 +1,135 @@
+"""Monte Carlo propagation of tape-measure tolerances to the derived dynamics.
+
+Every reading (grip_ref, cog_ref and each pair point) gets independent normal noise
+with the given standard deviation, and com, rog, center of percussion, ROG around
+grip and the tip/pommel pivot points are recomputed for every draw. Draws for many
+swords are done as one array operation, in chunks to bound memory, and can be split
+across processes by sword.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from swords import GRIP, center_of_percussion, conjugate_point, rog_around_grip, rog_from_pairs
+
+# Standard deviation of each reading, in catalog units
+TOLERANCES = {'grip_ref': 0.1, 'cog_ref': 0.2, 'pairs': 0.3}
+DRAWS = 100_000
+LEVEL = 0.95
+CHUNK_VALUES = 4_000_000  # Max sword x draw values generated at once
+QUANTITIES = ['com', 'rog', 'cop', 'rog_grip', 'tip_pivot', 'pommel_pivot']
+
+
+def draw_dynamics(inputs, draws, tolerances, rng):
+    """Derived quantities for every draw; inputs are per-sword arrays, results (n, draws)"""
+    grip_ref, cog_ref, hilt_ext, blade_ext, pairs = inputs
+    n, n_points = pairs.shape
+    grip = grip_ref[:, None] + rng.normal(0, tolerances['grip_ref'], (n, draws))
+    com = cog_ref[:, None] + rng.normal(0, tolerances['cog_ref'], (n, draws)) - grip
+    noisy = pairs[:, None, :] + rng.normal(0, tolerances['pairs'], (n, draws, n_points))
+    rog = rog_from_pairs(com.ravel(), (noisy - grip[:, :, None]).reshape(n * draws, n_points)).reshape(n, draws)
+    length = blade_ext[:, None] - grip
+    pommel = hilt_ext[:, None] - grip
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'com': com,
+            'rog': rog,
+            'cop': center_of_percussion(com, rog, GRIP),
+            'rog_grip': rog_around_grip(com, rog, GRIP),
+            'tip_pivot': conjugate_point(com, rog, length),
+            'pommel_pivot': conjugate_point(com, rog, pommel),
+        }
+
+
+def _summarize(values, level):
+    lo, hi = np.nanquantile(values, [(1 - level) / 2, (1 + level) / 2], axis=1)
+    return {'mean': np.nanmean(values, axis=1), 'std': np.nanstd(values, axis=1), 'lo': lo, 'hi': hi}
+
+
+def _intervals(inputs, draws, tolerances, level, seed):
+    """Summaries for one block of swords, drawing in chunks that fit CHUNK_VALUES"""
+    rng = np.random.default_rng(seed)
+    n = len(inputs[0])
+    per_chunk = max(1, CHUNK_VALUES // (draws * max(1, inputs[4].shape[1])))
+    parts = []
+    for s in range(0, n, per_chunk):
+        chunk = [a[s:s + per_chunk] for a in inputs]
+        values = draw_dynamics(chunk, draws, tolerances, rng)
+        parts.append({q: _summarize(values[q], level) for q in QUANTITIES})
+    return {q: {k: np.concatenate([p[q][k] for p in parts]) for k in ('mean', 'std', 'lo', 'hi')}
+            for q in QUANTITIES}
+
+
+def _interval_job(job):
+    return _intervals(*job)
+
+
+def confidence_intervals(table, rows=None, draws=DRAWS, tolerances=None, level=LEVEL, seed=0, workers=1):
+    """Mean, std and central `level` interval of each quantity for the given table rows.
+
+    Returns {quantity: {'mean', 'std', 'lo', 'hi'}} with one value per row. With
+    workers > 1 the rows are split across processes; results are reproducible for a
+    given seed and number of workers.
+    """
+    tolerances = {**TOLERANCES, **(tolerances or {})}
+    rows = np.arange(len(table)) if rows is None else np.asarray(rows)
+    inputs = [table.grip_ref[rows], table.cog_ref[rows], table.hilt_ext[rows], table.blade_ext[rows], table.pairs[rows]]
+    if workers <= 1 or len(rows) <= 1:
+        return _intervals(inputs, draws, tolerances, level, seed)
+
+    blocks = np.array_split(np.arange(len(rows)), min(workers, len(rows)))
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    jobs = [([a[b] for a in inputs], draws, tolerances, level, s) for b, s in zip(blocks, seeds)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_interval_job, jobs))
+    return {q: {k: np.concatenate([p[q][k] for p in parts]) for k in ('mean', 'std', 'lo', 'hi')}
+            for q in QUANTITIES}
+
+
+def row_interval(intervals, i):
+    """The intervals of one row as {quantity: (mean, std, lo, hi)}"""
+    return {q: tuple(float(intervals[q][k][i]) for k in ('mean', 'std', 'lo', 'hi')) for q in QUANTITIES}
+
+
+def add_error_bands(fig, sword, interval):
+    """Draw interval bars for one sword: along the axis for positions, around the DBPs.
+
+    interval is row_interval() for the sword. Bars are centered on the measured value,
+    so asymmetric intervals show as uneven arms.
+    """
+    import plotly.graph_objects as go
+    from dbp_plot import theme
+
+    def arms(quantity, value):
+        _, _, lo, hi = interval[quantity]
+        return [max(hi - value, 0)], [max(value - lo, 0)]
+
+    points = [
+        ('cop', sword.cop, 'Center of Percussion', theme['grip']),
+        ('rog_grip', sword.rog_grip, 'ROG around Grip', theme['rog_grip']),
+        ('tip_pivot', conjugate_point(sword.com, sword.rog, sword.length), 'Pivot at Tip', theme['tip']),
+        ('pommel_pivot', conjugate_point(sword.com, sword.rog, sword.pommel), 'Action at Pommel', theme['pommel']),
+        ('com', sword.com, 'Center of Mass', theme['com']),
+    ]
+    for quantity, value, name, color in points:
+        plus, minus = arms(quantity, value)
+        fig.add_trace(go.Scatter(
+            x=[value], y=[0], mode='markers', marker=dict(color=color, size=1),
+            error_x=dict(type='data', symmetric=False, array=plus, arrayminus=minus,
+                         color=color, thickness=2, width=6),
+            name=f"{name} {LEVEL:.0%} interval", showlegend=False,
+            hovertemplate=f"{name}<br>%{{x:.1f}} ({interval[quantity][2]:.1f} to {interval[quantity][3]:.1f})<extra></extra>"
+        ))
+
+    # DBPs: com uncertainty across, rog uncertainty up and down
+    com_plus, com_minus = arms('com', sword.com)
+    rog_plus, rog_minus = arms('rog', sword.rog)
+    fig.add_trace(go.Scatter(
+        x=[sword.com, sword.com], y=[sword.rog, -sword.rog], mode='markers',
+        marker=dict(color=theme['rog'], size=1),
+        error_x=dict(type='data', symmetric=False, array=com_plus * 2, arrayminus=com_minus * 2,
+                     color=theme['rog'], thickness=2, width=6),
+        error_y=dict(type='data', symmetric=False, array=rog_plus + rog_minus, arrayminus=rog_minus + rog_plus,
+                     color=theme['rog'], thickness=2, width=6),
+        name=f"DBP {LEVEL:.0%} interval", showlegend=False, hoverinfo='skip'
+    ))
@@ -0,0 +1,187 @@
+"""Keep a gallery up to date while the catalog CSV is being edited.
+
+Each poll stats the file. When it changed, its lines are compared with the previous
+load by sword name, and only added or changed rows are parsed, recomputed and
+rendered; pages of removed swords are deleted. Apart from splitting the file into
+lines and rewriting the index, the work per save depends on the number of edited
+rows, not on the catalog size. Pages are tracked in the gallery manifest, so a later
+full gallery run skips everything watch already rendered.
+"""
+import argparse
+import csv
+import os
+import time
+
+import precompress
+import profiling
+from gallery import (PLOTLYJS, THUMBS, page_key, plottable_rows, read_manifest, remove_page, render_jobs,
+                     report_skipped, slugify, thumb_filename, write_index, write_manifest, write_plotlyjs)
+from svg_thumbs import render_thumbnails
+from swords import SwordTable, columns_from_rows, normalize_name
+
+INTERVAL = 0.5  # Seconds between polls
+
+
+def row_keys(lines, name_col):
+    """Stable key of every line: (normalized name, occurrence), or the row number without names"""
+    if name_col is None:
+        return [(None, i) for i in range(len(lines))]
+    keys = []
+    seen = {}
+    for line in lines:
+        # Plain split unless the line has quoted fields
+        fields = next(csv.reader([line])) if '"' in line else line.split(',', name_col + 1)
+        name = normalize_name(fields[name_col]) if name_col < len(fields) else ''
+        n = seen[name] = seen.get(name, 0) + 1
+        keys.append((name, n))
+    return keys
+
+
+class GalleryWatcher:
+    """Incrementally syncs out_dir with csv_file; call sync() after every change"""
+
+    def __init__(self, csv_file='data_swords.csv', out_dir='gallery', workers=None, compact=False, compress=()):
+        self.csv_file = csv_file
+        self.out_dir = out_dir
+        self.workers = workers
+        self.compact = compact
+        self.compress = precompress.available(compress)
+        self.stamp = None
+        self.header = None
+        self.lines = {}  # key -> CSV line of the last successful sync
+        self.swords = {}  # key -> Sword, for the index
+        self.filenames = {}  # key -> page file name
+        os.makedirs(os.path.join(out_dir, THUMBS), exist_ok=True)
+        self.manifest = read_manifest(out_dir)
+
+    def changed(self):
+        """Whether the file was modified since the last poll"""
+        try:
+            st = os.stat(self.csv_file)
+        except FileNotFoundError:  # Editors that replace the file on save
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        return True
+
+    def _filename(self, name):
+        used = set(self.filenames.values())
+        slug = base = slugify(name)
+        n = 2
+        while f"{slug}.html" in used:
+            slug = f"{base}_{n}"
+            n += 1
+        return f"{slug}.html"
+
+    def _parse(self, header, lines, rows):
+        """SwordTable of the given line numbers only"""
+        columns = columns_from_rows(header, list(csv.reader(lines[i] for i in rows)))
+        if 'name' not in columns:
+            columns['name'] = [f'Sword_{i+1}' for i in rows]
+        return SwordTable.from_columns(columns)
+
+    def sync(self):
+        """Bring the gallery in line with the file; returns (rendered, removed) counts.
+
+        A file that does not parse (e.g. saved mid-edit) is reported and left for the
+        next change. Rows without a ROG yet (pairs not filled in) are reported and get
+        no page until they have one.
+        """
+        from cache import DynamicsCache, entry_circles
+
+        start = time.perf_counter()
+        with open(self.csv_file, newline='') as f:
+            header, *lines = [line for line in f.read().splitlines() if line.strip()]
+        fields = [col.strip() for col in next(csv.reader([header]))]
+        if header != self.header:
+            self.lines = {}
+        name_col = fields.index('name') if 'name' in fields else None
+        keys = row_keys(lines, name_col)
+        current = dict(zip(keys, lines))
+        rows = [i for i, key in enumerate(keys) if self.lines.get(key) != lines[i]]
+        removed = [key for key in self.filenames if key not in current]
+        if not rows and not removed and list(self.lines) == keys:
+            return 0, 0
+
+        try:
+            table = self._parse(fields, lines, rows)
+        except (ValueError, IndexError, KeyError) as e:
+            print(f"{self.csv_file}: not updated, could not parse ({e})")
+            return 0, 0
+        parsed, skipped = plottable_rows(table, range(len(table)))
+        report_skipped(table, skipped)
+        # A row that lost its ROG loses its page
+        removed += [keys[rows[j]] for j in skipped if keys[rows[j]] in self.filenames]
+
+        total = 0
+        if not os.path.exists(os.path.join(self.out_dir, PLOTLYJS)):
+            total += write_plotlyjs(self.out_dir, self.compress)
+        for key in removed:
+            filename = self.filenames.pop(key)
+            self.swords.pop(key, None)
+            self.manifest.pop(filename, None)
+            remove_page(self.out_dir, filename)
+
+        with DynamicsCache() as cache:
+            entries = cache.lookup(table, parsed)
+        jobs = []
+        thumbs = []
+        for j, (key, _, arrays) in zip(parsed, entries):
+            i = rows[j]
+            sword = table.sword(j)
+            self.swords[keys[i]] = sword
+            filename = self.filenames.get(keys[i]) or self._filename(sword.name)
+            self.filenames[keys[i]] = filename
+            path = os.path.join(self.out_dir, filename)
+            thumb = os.path.join(self.out_dir, thumb_filename(filename))
+            page = page_key(key, self.compact, self.compress)
+            if self.manifest.get(filename) == page and os.path.exists(path) and os.path.exists(thumb):
+                continue
+            jobs.append((sword, path, entry_circles(arrays), self.compact, self.compress, profiling.enabled()))
+            thumbs.append((j, thumb))
+            self.manifest[filename] = page
+        total += render_jobs(jobs, self.workers)
+        total += render_thumbnails(table, [j for j, _ in thumbs], [thumb for _, thumb in thumbs], self.workers)
+        indexed = [(self.swords[key], self.filenames[key]) for key in keys if key in self.swords]
+        total += write_index(self.out_dir, indexed, self.compress)
+        write_manifest(self.out_dir, self.manifest)
+        self.header, self.lines = header, current
+
+        elapsed = time.perf_counter() - start
+        print(f"{time.strftime('%H:%M:%S')} rendered {len(jobs)}, removed {len(removed)} "
+              f"({len(parsed) - len(jobs)} parsed unchanged) in {elapsed * 1000:.0f} ms, {total / 1024:.0f} KB written")
+        return len(jobs), len(removed)
+
+    def run(self, interval=INTERVAL):
+        """Poll forever, syncing after every change"""
+        print(f"Watching {self.csv_file} -> {self.out_dir}/ (Ctrl-C to stop)")
+        try:
+            while True:
+                if self.changed():
+                    self.sync()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(csv_file='data_swords.csv', out_dir='gallery', interval=INTERVAL, workers=None, compact=False, compress=()):
+    GalleryWatcher(csv_file, out_dir, workers, compact, compress).run(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render gallery pages as the catalog CSV changes")
+    parser.add_argument('csv', nargs='?', default='data_swords.csv')
+    parser.add_argument('-o', '--out', default='gallery', help="output directory")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('-i', '--interval', type=float, default=INTERVAL, help="seconds between polls")
+    parser.add_argument('--compact', action='store_true', help="round and binary-encode coordinates")
+    parser.add_argument('--compress', type=precompress.parse_encodings, default=[], metavar='gz,br',
+                        help="also write precompressed copies for a static server")
+    args = parser.parse_args()
+    watch(args.csv, args.out, args.interval, args.workers, args.compact, args.compress)
+
+
+if __name__ == "__main__":
+    main()